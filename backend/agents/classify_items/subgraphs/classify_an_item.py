@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, create_model
 from typing import Annotated, Any
+from functools import lru_cache
 import operator
 
 from langchain_core.prompts import (
@@ -23,7 +24,7 @@ from agents.state import (
 from agents.utils import (
     format_children_nodes_from_parent_node_ids,
     format_single_item,
-    has_children_nodes,
+    build_parent_set,
     get_model_count_dict,
     choose_top_node_ids_from_classification_results,
     abbreviate_node_ids,
@@ -48,6 +49,43 @@ important_notes = [
 important_notes = "- " + "\n- ".join(important_notes).strip()
 
 
+class FinalJudge(BaseModel):
+    rationale: str = Field(
+        description="Think carefully and holistically which nodes are the most appropriate for the item. You can choose more than one node if you think the item belongs to multiple nodes. If there is no node that the item belongs to, return empty string."
+    )
+    node_labels: list[str] = Field(
+        description="The labels of the nodes that the item is classified as. If the item doesn't belong to any of the children nodes, return empty list."
+    )
+    node_ids: list[str] = Field(
+        description="The ids of the nodes that the item is classified as. If the item doesn't belong to any of the children nodes, return empty list."
+    )
+
+
+@lru_cache(maxsize=128)
+def build_classification_schema(
+    children_node_labels: tuple[str, ...],
+) -> type[BaseModel]:
+    """
+    Creates the output schema for classifying an item into the given children nodes.
+
+    Cached per branch so that all voters of a branch share the same schema class, which in turn lets LLMFactory reuse the structured output chain built for it.
+    """
+    # Dynamically create field definitions for the ValidateScheduleResponse class
+    fields = {str(label): (ConfidenceLevel) for label in children_node_labels}
+
+    JudgeForEachNode = create_model("JudgeForEachNode", **fields, __base__=BaseModel)  # type: ignore
+
+    class Schema(BaseModel):
+        does_belong_to_each_node: list[JudgeForEachNode] = Field(  # type: ignore
+            description="Examine each child node one by one, judging whether the item belongs to the node or not."
+        )
+        final_judge: FinalJudge = Field(
+            description="The final judge for the item. If the item doesn't belong to any of the children nodes, return empty list."
+        )
+
+    return Schema
+
+
 def spawn_classifications(state: ClassifySubGraphState):
     model_count_dict = get_model_count_dict(state.models, state.total_invocations)
     return Command(
@@ -125,37 +163,15 @@ Important Notes!
         important_notes=important_notes,
     )
 
-    # Dynamically create field definitions for the ValidateScheduleResponse class
-    children_node_labels = [
+    children_node_labels = tuple(
         node.label
         for node in state.nodes
         if node.parent_node_id == state.parent_node_id
-    ]
-    fields = {str(label): (ConfidenceLevel) for label in children_node_labels}
-
-    JudgeForEachNode = create_model("JudgeForEachNode", **fields, __base__=BaseModel)  # type: ignore
-
-    class FinalJudge(BaseModel):
-        rationale: str = Field(
-            description="Think carefully and holistically which nodes are the most appropriate for the item. You can choose more than one node if you think the item belongs to multiple nodes. If there is no node that the item belongs to, return empty string."
-        )
-        node_labels: list[str] = Field(
-            description="The labels of the nodes that the item is classified as. If the item doesn't belong to any of the children nodes, return empty list."
-        )
-        node_ids: list[str] = Field(
-            description="The ids of the nodes that the item is classified as. If the item doesn't belong to any of the children nodes, return empty list."
-        )
-
-    class Schema(BaseModel):
-        does_belong_to_each_node: list[JudgeForEachNode] = Field(  # type: ignore
-            description="Examine each child node one by one, judging whether the item belongs to the node or not."
-        )
-        final_judge: FinalJudge = Field(
-            description="The final judge for the item. If the item doesn't belong to any of the children nodes, return empty list."
-        )
+    )
+    Schema = build_classification_schema(children_node_labels)
 
     llm = LLMFactory()
-    classification_result: Schema = await llm.ainvoke(
+    classification_result = await llm.ainvoke(
         model=state.model,
         prompts=input_messages,
         output_schema=Schema,
@@ -166,18 +182,20 @@ Important Notes!
 
     # Sometimes, the model returns a wrong node_id for a node_label.
     # Check if the node_ids and node_labels are consistent with each other.
+    label_by_node_id = {}
+    node_id_by_label = {}
+    for node in abbreviated_nodes:
+        label_by_node_id.setdefault(node.id, node.label)
+        node_id_by_label.setdefault(node.label, node.id)
+
     correct_node_ids = []
     correct_node_labels = []
     for node_id, node_label in zip(
         classification_result.final_judge.node_ids,
         classification_result.final_judge.node_labels,
     ):
-        label_with_the_node_id = next(
-            (node.label for node in abbreviated_nodes if node.id == node_id), None
-        )
-        id_with_the_node_label = next(
-            (node.id for node in abbreviated_nodes if node.label == node_label), None
-        )
+        label_with_the_node_id = label_by_node_id.get(node_id)
+        id_with_the_node_label = node_id_by_label.get(node_label)
 
         if label_with_the_node_id is None or node_label != label_with_the_node_id:
             # The generated node id is incorrect
@@ -224,10 +242,11 @@ def end_of_workflow(state: ClassifySubGraphState):
         )
     )
 
+    parent_node_ids = build_parent_set(state.nodes)
     new_parent_node_ids = [
         node_id
         for node_id, _ in selected_node_and_confidence_score
-        if has_children_nodes(state.nodes, node_id)
+        if node_id in parent_node_ids
     ]
     cases_need_further_classification = [
         {parent_node_id: state.current_item} for parent_node_id in new_parent_node_ids
@@ -242,11 +261,14 @@ def end_of_workflow(state: ClassifySubGraphState):
         }
     )
 
-    updated_current_item = ItemState(
+    # All values come from already validated models, so skip re-validation.
+    updated_current_item = ItemState.model_construct(
         id=state.current_item.id,
         content=state.current_item.content,
         classified_as=[
-            NodeAndConfidence(node_id=node_id, confidence_score=confidence_score)
+            NodeAndConfidence.model_construct(
+                node_id=node_id, confidence_score=confidence_score
+            )
             for node_id, confidence_score in selected_node_and_confidence_score
         ],
     )
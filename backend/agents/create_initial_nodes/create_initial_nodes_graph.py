@@ -20,7 +20,14 @@ from agents.utils import (
     abbreviate_node_ids,
     restore_abbreviated_node_ids,
 )
-from agents.state import ClassNodeState, Taxonomy, ItemState, node_reducer, root_node
+from agents.state import (
+    ClassNodeState,
+    Taxonomy,
+    ItemState,
+    ReducerOp,
+    node_reducer,
+    root_node,
+)
 
 
 class CreateInitialNodesState(BaseModel):
@@ -145,17 +152,15 @@ async def create_taxonomy(state: CreateInitialNodesState):
     ]
 
     # remove nodes that are already in the taxonomy
-    nodes = [node for node in nodes if node.id not in [node.id for node in state.nodes]]
+    existing_node_ids = {node.id for node in state.nodes}
+    nodes = [node for node in nodes if node.id not in existing_node_ids]
 
     restored_nodes = restore_abbreviated_node_ids(
         nodes, state.abbreviated_id_to_original_map
     )
-    restored_nodes.append(
-        ClassNodeState(id="REPLACE_ALL", parent_node_id="", label="", description="")
-    )
 
     return {
-        "nodes": restored_nodes,
+        "nodes": [ReducerOp.REPLACE_ALL] + restored_nodes,
         "message_history": [
             AIMessage(content="\n".join([node.model_dump_json() for node in nodes]))
         ],
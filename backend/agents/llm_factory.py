@@ -1,9 +1,20 @@
 import asyncio
 import random
 import logging
+import httpx
+import orjson
 from enum import Enum
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import Any, Callable, Literal, Type, TypeVar, cast, Union, Optional
+from typing import (
+    Any,
+    Callable,
+    Literal,
+    Type,
+    TypeVar,
+    Union,
+    Optional,
+)
 
 from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
 from langchain_core.runnables import Runnable
@@ -45,66 +56,144 @@ class AnthropicModel(Enum):
 
 AIModel = Union[OpenAIModel, AnthropicModel]
 
+_OPENAI_BY_VALUE: dict[str, OpenAIModel] = {model.value: model for model in OpenAIModel}
+_ANTHROPIC_BY_VALUE: dict[str, AnthropicModel] = {
+    model.value: model for model in AnthropicModel
+}
+_AVAILABLE_MODELS: tuple[str, ...] = (*_OPENAI_BY_VALUE, *_ANTHROPIC_BY_VALUE)
+
+# Based on official Anthropic documentation
+_ANTHROPIC_MAX_TOKENS: dict[AnthropicModel, int] = {
+    AnthropicModel.CLAUDE_OPUS_4_1: 32000,  # claude-opus-4-1-20250805
+    AnthropicModel.CLAUDE_OPUS_4: 32000,  # claude-opus-4-20250514
+    AnthropicModel.CLAUDE_SONNET_4: 64000,  # claude-sonnet-4-20250514
+    AnthropicModel.CLAUDE_SONNET_3_7: 64000,  # claude-3-7-sonnet-20250219
+    AnthropicModel.CLAUDE_SONNET_3_5: 8192,  # claude-3-5-sonnet-20241022 (upgraded version)
+    AnthropicModel.CLAUDE_HAIKU_3_5: 8192,  # claude-3-5-haiku-20241022
+}
+
 
 T = TypeVar("T", bound=BaseModel)
 
+DEFAULT_MAX_CONCURRENCY = 32
+
+# HTTP client shared by the OpenAI clients. It is opened and closed by the app lifespan so that
+# it lives on the serving event loop; outside the app it stays None and ChatOpenAI falls back to
+# its own client.
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def open_http_async_client(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> httpx.AsyncClient:
+    """Create the shared HTTP client with a pool sized for max_concurrency in-flight requests."""
+    global _http_async_client
+    _http_async_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency,
+        )
+    )
+    _clear_client_caches()
+    return _http_async_client
+
+
+async def close_http_async_client() -> None:
+    """Close the shared HTTP client opened by open_http_async_client."""
+    global _http_async_client
+    if _http_async_client is None:
+        return
+    client, _http_async_client = _http_async_client, None
+    _clear_client_caches()
+    await client.aclose()
+
+
+def _clear_client_caches() -> None:
+    # Cached clients and runnables keep a reference to the HTTP client they were built with.
+    _get_cached_openai_client.cache_clear()
+    _build_runnable.cache_clear()
+
+
+# Clients are cached per (model, temperature) so that repeated calls, e.g. the voters in
+# parallel_ainvoke, reuse the same client and its underlying connection pool.
+# with_structured_output / bind_tools / with_fallbacks return new Runnables, so the cached
+# clients themselves are never mutated.
+@lru_cache(maxsize=128)
+def _get_cached_openai_client(
+    model_value: str, temperature: Optional[float] = None
+) -> ChatOpenAI:
+    if temperature is None:
+        return ChatOpenAI(
+            model=model_value,
+            max_retries=0,
+            http_async_client=_http_async_client,
+        )
+    return ChatOpenAI(
+        model=model_value,
+        temperature=temperature,
+        max_retries=0,
+        http_async_client=_http_async_client,
+    )
+
+
+_ANTHROPIC_STOP = ("\n\nHuman:",)
+
+
+@lru_cache(maxsize=128)
+def _get_cached_anthropic_client(
+    model_value: str, temperature: Optional[float] = None
+) -> ChatAnthropic:
+    # ChatAnthropic has default max output token to be 1024, so we have to set it to the max token for the model.
+    max_tokens_to_sample = get_max_output_token_for_model(AnthropicModel(model_value))
+
+    if temperature is None:
+        return ChatAnthropic(
+            model_name=model_value,
+            stop=list(_ANTHROPIC_STOP),
+            max_retries=0,
+            timeout=60,
+            max_tokens_to_sample=max_tokens_to_sample,
+        )
+    return ChatAnthropic(
+        model_name=model_value,
+        temperature=temperature,
+        timeout=60,
+        stop=list(_ANTHROPIC_STOP),
+        max_retries=0,
+        max_tokens_to_sample=max_tokens_to_sample,
+    )
+
 
 class LLMFactory:
+    @staticmethod
     def _init_openai_client(
-        self,
         model: OpenAIModel,
         temperature: Optional[float] = None,
     ) -> ChatOpenAI:
-        if temperature is None:
-            return ChatOpenAI(
-                model=model.value,
-                max_retries=0,
-            )
-        return ChatOpenAI(
-            model=model.value,
-            temperature=temperature,
-            max_retries=0,
-        )
+        return _get_cached_openai_client(model.value, temperature)
 
+    @staticmethod
     def _init_anthropic_client(
-        self,
         model: AnthropicModel,
         temperature: Optional[float] = None,
     ) -> ChatAnthropic:
-        # ChatAnthropic has default max output token to be 1024, so we have to set it to the max token for the model.
-        max_tokens_to_sample = get_max_output_token_for_model(model)
-
-        if temperature is None:
-            return ChatAnthropic(
-                model_name=model.value,
-                stop=["\n\nHuman:"],
-                max_retries=0,
-                timeout=60,
-                max_tokens_to_sample=max_tokens_to_sample,
-            )
-        return ChatAnthropic(
-            model_name=model.value,
-            temperature=temperature,
-            timeout=60,
-            stop=["\n\nHuman:"],
-            max_retries=0,
-            max_tokens_to_sample=max_tokens_to_sample,
-        )
+        return _get_cached_anthropic_client(model.value, temperature)
 
+    @staticmethod
     def _init_llm_client(
-        self,
         model: Union[AIModel, str],
         temperature: Optional[float] = None,
     ) -> Union[ChatOpenAI, ChatAnthropic]:
         if isinstance(model, OpenAIModel):
-            return self._init_openai_client(model, temperature)
+            return LLMFactory._init_openai_client(model, temperature)
         elif isinstance(model, AnthropicModel):
-            return self._init_anthropic_client(model, temperature)
+            return LLMFactory._init_anthropic_client(model, temperature)
         else:
             raise ValueError(f"Model {model} (type: {type(model)}) is not supported")
 
+    @staticmethod
     def _get_available_structured_output_method(
-        self, model: AIModel
+        model: AIModel,
     ) -> Literal["json_mode", "function_calling", "json_schema"]:
         """
         As of 2025 July, OpenAI recent models all support 'structured_output' which is json_schema in LangChain's terminology.
@@ -142,44 +231,18 @@ class LLMFactory:
         if isinstance(model, str):
             model = string_to_ai_model(model)
 
-        llm = self._init_llm_client(model, temperature)
-
-        # Apply structured output if schema is provided
-        if output_schema:
-            if method is None:
-                method = self._get_available_structured_output_method(model)
-            llm = llm.with_structured_output(
-                schema=output_schema,
-                method=method,
-                include_raw=True,
-            )
-        elif tools:
-            llm = llm.bind_tools(tools)
-
-        if fallback_models:
-            fallback_llms = []
-            for fallback_model in fallback_models:
-                fallback_client = self._init_llm_client(fallback_model, temperature)
-                if output_schema:
-                    if method is None:
-                        method = self._get_available_structured_output_method(
-                            fallback_model
-                        )
-                    fallback_client = fallback_client.with_structured_output(
-                        schema=output_schema,
-                        method=method,
-                        include_raw=True,
-                    )
-                elif tools:
-                    fallback_client = fallback_client.bind_tools(tools)
-                fallback_llms.append(
-                    cast(Runnable[LanguageModelInput, BaseMessage], fallback_client)
-                )
-
-            llm = llm.with_fallbacks(fallback_llms)
-
-        if tools:
-            llm = llm | PydanticToolsParser(tools=tools)
+        # The same prompts list is shared by concurrent callers (e.g. the voters in parallel_ainvoke),
+        # so copy it once here to keep retries from leaking messages into other calls.
+        prompts = list(prompts)
+
+        llm = _build_runnable(
+            model,
+            output_schema,
+            tuple(tools) if tools else None,
+            method,
+            temperature,
+            tuple(fallback_models),
+        )
 
         response = await self._exception_handler(
             func=llm.ainvoke,
@@ -246,15 +309,17 @@ class LLMFactory:
                             response_content = response["raw"].content
                         elif isinstance(response["raw"].content, list):
                             response_content = [
-                                item.model_dump_json()
-                                if hasattr(item, "model_dump_json")
+                                orjson.dumps(item.model_dump()).decode()
+                                if hasattr(item, "model_dump")
                                 else str(item)
                                 for item in response["raw"].content
                             ]
                         else:
                             response_content = (
-                                response["raw"].content.model_dump_json()
-                                if hasattr(response["raw"].content, "model_dump_json")
+                                orjson.dumps(
+                                    response["raw"].content.model_dump()
+                                ).decode()
+                                if hasattr(response["raw"].content, "model_dump")
                                 else str(response["raw"].content)
                             )
                     except Exception as e:
@@ -264,84 +329,69 @@ class LLMFactory:
                         break
 
                     # When the response doesn't follow the output schema, Add the response and error message to the prompt and try again.
-                    prompts.extend(
-                        [
-                            AIMessage(content=response_content),
-                            HumanMessage(
-                                content=f"Your last response was invalid causing the following error:\n\n{response.get('parsing_error')}\n\nPlease fix the error and try again. Here is the correct json output schema:\n\n{output_schema.model_json_schema()}"
-                            ),
-                        ]
-                    )
+                    prompts = prompts + [
+                        AIMessage(content=response_content),
+                        HumanMessage(
+                            content=f"Your last response was invalid causing the following error:\n\n{response.get('parsing_error')}\n\n{_retry_suffix(output_schema)}"
+                        ),
+                    ]
                     continue
 
                 return response
             except Exception as e:
                 error_message = str(e).lower()
 
-                if ErrorCode.INVALID_PROMPT_INPUT.value.lower() in error_message:
-                    logger.error(
-                        f"Invalid prompt input for model {model}: {error_message}"
-                    )
-                elif ErrorCode.INVALID_TOOL_RESULTS.value.lower() in error_message:
-                    logger.error(
-                        f"Invalid tool results for model {model}: {error_message}"
-                    )
-                elif ErrorCode.MESSAGE_COERCION_FAILURE.value.lower() in error_message:
-                    logger.error(
-                        f"Message coercion failure for model {model}: {error_message}"
-                    )
-                elif (
-                    ErrorCode.MODEL_AUTHENTICATION.value.lower() in error_message
-                    or "401" in error_message
-                    or "403" in error_message
-                    or "unauthorized" in error_message
-                    or "permission denied" in error_message
-                ):
-                    logger.error(
-                        f"Authentication error with model {model}: {error_message}"
-                    )
-                elif (
-                    ErrorCode.MODEL_NOT_FOUND.value.lower() in error_message
-                    or "404" in error_message
-                    or "not found" in error_message
-                ):
-                    logger.error(f"Model not found: {model}: {error_message}")
-                    raise ValueError(f"Model not found: {model}: {error_message}")
-                elif (
-                    ErrorCode.MODEL_RATE_LIMIT.value.lower() in error_message
-                    or "429" in error_message  # openai
-                    or "529" in error_message  # anthropic
-                    or "rate limit" in error_message
-                    or "bad request" in error_message
-                ):
-                    if attempt < max_retries:
-                        # Calculate exponential backoff delay with jitter
-                        delay = base_delay * (2**attempt) + random.uniform(0, 1)
-                        logger.warning(
-                            f"Rate limit exceeded for model {model} (attempt {attempt + 1}/{max_retries + 1}). "
-                            f"Retrying in {delay:.2f} seconds..."
+                match _classify_error(e, error_message):
+                    case "invalid_prompt_input":
+                        logger.error(
+                            f"Invalid prompt input for model {model}: {error_message}"
+                        )
+                    case "invalid_tool_results":
+                        logger.error(
+                            f"Invalid tool results for model {model}: {error_message}"
+                        )
+                    case "message_coercion_failure":
+                        logger.error(
+                            f"Message coercion failure for model {model}: {error_message}"
+                        )
+                    case "authentication":
+                        logger.error(
+                            f"Authentication error with model {model}: {error_message}"
+                        )
+                    case "not_found":
+                        logger.error(f"Model not found: {model}: {error_message}")
+                        raise ValueError(f"Model not found: {model}: {error_message}")
+                    case "rate_limit":
+                        if attempt < max_retries:
+                            # Calculate exponential backoff delay with jitter
+                            delay = base_delay * (2**attempt) + random.uniform(0, 1)
+                            logger.warning(
+                                f"Rate limit exceeded for model {model} (attempt {attempt + 1}/{max_retries + 1}). "
+                                f"Retrying in {delay:.2f} seconds..."
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                        else:
+                            logger.error(
+                                f"Rate limit exceeded for model {model} after {max_retries + 1} attempts: {error_message}"
+                            )
+                    case "output_parsing_failure":
+                        logger.error(
+                            f"Output parsing failed for model {model}: {error_message}"
+                        )
+                    case "server_error":
+                        logger.error(
+                            f"Internal server error with model {model}: {error_message}"
                         )
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
+                    case "invalid_schema":
                         logger.error(
-                            f"Rate limit exceeded for model {model} after {max_retries + 1} attempts: {error_message}"
+                            f"Invalide Schema error with model {model}: {error_message}"
+                        )
+                        break
+                    case _:
+                        logger.error(
+                            f"LangChain error with model {model}: {error_message}"
                         )
-                elif ErrorCode.OUTPUT_PARSING_FAILURE.value.lower() in error_message:
-                    logger.error(
-                        f"Output parsing failed for model {model}: {error_message}"
-                    )
-                elif "503" in error_message:
-                    logger.error(
-                        f"Internal server error with model {model}: {error_message}"
-                    )
-                elif "400" in error_message and "invalid schema" in error_message:
-                    logger.error(
-                        f"Invalide Schema error with model {model}: {error_message}"
-                    )
-                    break
-                else:
-                    logger.error(f"LangChain error with model {model}: {error_message}")
 
         logger.critical(
             f"Failed to get valid response from {model} after {max_retries + 1} attempts"
@@ -413,6 +463,142 @@ class LLMFactory:
         return responses
 
 
+@lru_cache(maxsize=128)
+def _build_runnable(
+    model: AIModel,
+    output_schema: Optional[Type[BaseModel]],
+    tools: Optional[tuple[Type[BaseModel], ...]],
+    method: Optional[Literal["json_mode", "function_calling", "json_schema"]],
+    temperature: Optional[float],
+    fallback_models: tuple[AIModel, ...],
+) -> Runnable:
+    """
+    Builds the full invocation chain (client -> structured output / tools -> fallbacks -> tools parser).
+
+    The chain is cached so that concurrent calls with the same arguments, e.g. the voters of
+    a classification, share one pipeline instead of re-binding the schema on every call.
+    Fallback bindings are built inside the same cache entry; they are keyed by the same
+    arguments, so a separate cache for them would not add hits.
+    Schemas and tools are keyed by class identity, so dynamically created schemas with the
+    same name don't collide.
+    """
+    llm = _bind_output(model, output_schema, method, tools, temperature)
+
+    if fallback_models:
+        llm = llm.with_fallbacks(
+            [
+                _bind_output(fallback_model, output_schema, method, tools, temperature)
+                for fallback_model in fallback_models
+            ]
+        )
+
+    if tools:
+        llm = llm | PydanticToolsParser(tools=list(tools))
+
+    return llm
+
+
+def _bind_output(
+    model: AIModel,
+    output_schema: Optional[Type[BaseModel]],
+    method: Optional[Literal["json_mode", "function_calling", "json_schema"]],
+    tools: Optional[tuple[Type[BaseModel], ...]],
+    temperature: Optional[float],
+) -> Runnable[LanguageModelInput, Any]:
+    llm = LLMFactory._init_llm_client(model, temperature)
+
+    # Apply structured output if schema is provided
+    if output_schema:
+        # Each model resolves its own default method, so an Anthropic fallback doesn't
+        # inherit json_schema from an OpenAI primary model.
+        return llm.with_structured_output(
+            schema=output_schema,
+            method=method or LLMFactory._get_available_structured_output_method(model),
+            include_raw=True,
+        )
+    elif tools:
+        return llm.bind_tools(tools)
+
+    return llm
+
+
+_EC_INVALID_PROMPT_INPUT = ErrorCode.INVALID_PROMPT_INPUT.value.lower()
+_EC_INVALID_TOOL_RESULTS = ErrorCode.INVALID_TOOL_RESULTS.value.lower()
+_EC_MESSAGE_COERCION_FAILURE = ErrorCode.MESSAGE_COERCION_FAILURE.value.lower()
+_EC_MODEL_AUTHENTICATION = ErrorCode.MODEL_AUTHENTICATION.value.lower()
+_EC_MODEL_NOT_FOUND = ErrorCode.MODEL_NOT_FOUND.value.lower()
+_EC_MODEL_RATE_LIMIT = ErrorCode.MODEL_RATE_LIMIT.value.lower()
+_EC_OUTPUT_PARSING_FAILURE = ErrorCode.OUTPUT_PARSING_FAILURE.value.lower()
+
+# Checked in order, the first entry with a matching substring wins.
+_ERROR_PATTERNS: tuple[tuple[tuple[str, ...], str], ...] = (
+    ((_EC_INVALID_PROMPT_INPUT,), "invalid_prompt_input"),
+    ((_EC_INVALID_TOOL_RESULTS,), "invalid_tool_results"),
+    ((_EC_MESSAGE_COERCION_FAILURE,), "message_coercion_failure"),
+    (
+        (
+            _EC_MODEL_AUTHENTICATION,
+            "401",
+            "403",
+            "unauthorized",
+            "permission denied",
+        ),
+        "authentication",
+    ),
+    ((_EC_MODEL_NOT_FOUND, "404", "not found"), "not_found"),
+    (
+        (
+            _EC_MODEL_RATE_LIMIT,
+            "429",  # openai
+            "529",  # anthropic
+            "rate limit",
+            "bad request",
+        ),
+        "rate_limit",
+    ),
+    ((_EC_OUTPUT_PARSING_FAILURE,), "output_parsing_failure"),
+    (("503",), "server_error"),
+)
+
+# HTTP status codes exposed by the OpenAI/Anthropic SDK errors as `status_code`.
+_ERROR_STATUS_CODES: dict[int, str] = {
+    401: "authentication",
+    403: "authentication",
+    404: "not_found",
+    429: "rate_limit",
+    529: "rate_limit",
+    503: "server_error",
+}
+
+
+def _classify_error(error: Exception, error_message: str) -> Optional[str]:
+    status_code = getattr(error, "status_code", None)
+    if status_code in _ERROR_STATUS_CODES:
+        return _ERROR_STATUS_CODES[status_code]
+
+    for needles, kind in _ERROR_PATTERNS:
+        if any(needle in error_message for needle in needles):
+            return kind
+
+    if "invalid schema" in error_message and (
+        status_code == 400 or "400" in error_message
+    ):
+        return "invalid_schema"
+
+    return None
+
+
+@lru_cache(maxsize=64)
+def _schema_json(output_schema: Type[BaseModel]) -> dict[str, Any]:
+    # The schema classes are never modified after creation, so their JSON schema is only built once.
+    return output_schema.model_json_schema()
+
+
+@lru_cache(maxsize=64)
+def _retry_suffix(output_schema: Type[BaseModel]) -> str:
+    return f"Please fix the error and try again. Here is the correct json output schema:\n\n{_schema_json(output_schema)}"
+
+
 def string_to_ai_model(model_string: str) -> AIModel:
     """
     Convert a string model name to the corresponding AIModel enum.
@@ -426,43 +612,24 @@ def string_to_ai_model(model_string: str) -> AIModel:
     Raises:
         ValueError: If the model string doesn't match any known model
     """
-    # Check OpenAI models
-    for openai_model in OpenAIModel:
-        if openai_model.value == model_string:
-            return openai_model
-
-    # Check Anthropic models
-    for anthropic_model in AnthropicModel:
-        if anthropic_model.value == model_string:
-            return anthropic_model
-
-    # If no match found, raise an error with available options
-    available_models = [model.value for model in OpenAIModel] + [
-        model.value for model in AnthropicModel
-    ]
-    raise ValueError(
-        f"Unknown model: {model_string}. Available models: {available_models}"
-    )
+    try:
+        if model_string in _OPENAI_BY_VALUE:
+            return _OPENAI_BY_VALUE[model_string]
+        return _ANTHROPIC_BY_VALUE[model_string]
+    except KeyError:
+        raise ValueError(
+            f"Unknown model: {model_string}. Available models: {list(_AVAILABLE_MODELS)}"
+        )
 
 
+@lru_cache(maxsize=32)
 def get_max_output_token_for_model(model: AIModel) -> int:
     if isinstance(model, OpenAIModel):
         return 10000
     elif isinstance(model, AnthropicModel):
-        # Based on official Anthropic documentation
-        if model == AnthropicModel.CLAUDE_OPUS_4_1:
-            return 32000  # claude-opus-4-1-20250805
-        elif model == AnthropicModel.CLAUDE_OPUS_4:
-            return 32000  # claude-opus-4-20250514
-        elif model == AnthropicModel.CLAUDE_SONNET_4:
-            return 64000  # claude-sonnet-4-20250514
-        elif model == AnthropicModel.CLAUDE_SONNET_3_7:
-            return 64000  # claude-3-7-sonnet-20250219
-        elif model == AnthropicModel.CLAUDE_SONNET_3_5:
-            return 8192  # claude-3-5-sonnet-20241022 (upgraded version)
-        elif model == AnthropicModel.CLAUDE_HAIKU_3_5:
-            return 8192  # claude-3-5-haiku-20241022
-        else:
+        max_tokens = _ANTHROPIC_MAX_TOKENS.get(model)
+        if max_tokens is None:
             raise ValueError(f"Unknown Anthropic model: {model}")
+        return max_tokens
     else:
         raise ValueError(f"Unknown model: {model}")
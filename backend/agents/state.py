@@ -79,6 +79,13 @@ class ConfidenceLevel(Enum):
     TRUE = "True"
 
 
+class ReducerOp(Enum):
+    """Control message for node_reducer and item_reducer, sent as the first element of an update."""
+
+    REPLACE_ALL = "REPLACE_ALL"
+    RESET = "RESET"
+
+
 # ===========================================
 #              REDUCER FUNCTIONS
 # ===========================================
@@ -86,14 +93,35 @@ def extend_list(original: list, new: Any):
     if new is None:
         return original
 
-    if not isinstance(new, list):
-        new = [new]
-    if len(new) == 1 and new[0] == "RESET":
+    if isinstance(new, list):
+        if len(new) == 1 and new[0] == "RESET":
+            return []
+        original.extend(new)
+    elif new == "RESET":
         return []
-    original.extend(new)
+    else:
+        original.append(new)
     return original
 
 
+def pop_reducer_op(new: list) -> tuple[Optional[ReducerOp], list]:
+    if not new:
+        return None, new
+
+    if isinstance(new[0], ReducerOp):
+        return new[0], new[1:]
+
+    # Legacy sentinels are entries whose id is "REPLACE_ALL" or "RESET". They are still
+    # accepted at either end of the update because states validated as pydantic models,
+    # e.g. the initial state of a graph, can't carry a ReducerOp.
+    for index in (0, -1):
+        op_id = getattr(new[index], "id", None)
+        if op_id in ReducerOp._value2member_map_:
+            return ReducerOp(op_id), new[1:] if index == 0 else new[:-1]
+
+    return None, new
+
+
 root_node = ClassNodeState(
     id=ROOT_NODE_ID,
     label="Root",
@@ -103,7 +131,8 @@ root_node = ClassNodeState(
 
 
 def node_reducer(
-    original: list[ClassNodeState], new: list[ClassNodeState] | ClassNodeState | None
+    original: list[ClassNodeState],
+    new: list[ClassNodeState | ReducerOp] | ClassNodeState | None,
 ):
     if new is None:
         return original
@@ -111,80 +140,71 @@ def node_reducer(
     if not isinstance(new, list):
         new = [new]
 
-    if any(node.id == "REPLACE_ALL" for node in new):
-        return [root_node] + [node for node in new if node.id != "REPLACE_ALL"]
-
-    if any(node.id == "RESET" for node in new):
+    op, new = pop_reducer_op(new)
+    if op is ReducerOp.REPLACE_ALL:
+        return [root_node] + new
+    if op is ReducerOp.RESET:
         return [root_node]
 
     if len(original) == 0:
         original = [root_node]
 
+    index_by_id = {node.id: i for i, node in enumerate(original)}
     for new_node in new:
-        existing_node_index = None
-        for i, existing_node in enumerate(original):
-            if existing_node.id == new_node.id:
-                existing_node_index = i
-                break
+        existing_node_index = index_by_id.get(new_node.id)
 
-        if existing_node_index:
+        if existing_node_index is not None:
             original[existing_node_index] = new_node
         else:
+            index_by_id[new_node.id] = len(original)
             original.append(new_node)
 
     return original
 
 
-def item_reducer(original: list[ItemState], new: list[ItemState] | ItemState | None):
+def item_reducer(
+    original: list[ItemState], new: list[ItemState | ReducerOp] | ItemState | None
+):
     if new is None:
         return original
 
     if not isinstance(new, list):
         new = [new]
 
-    if any(item.id == "REPLACE_ALL" for item in new):
-        return [item for item in new if item.id != "REPLACE_ALL"]
+    op, new = pop_reducer_op(new)
+    if op is ReducerOp.REPLACE_ALL:
+        return new
+    if op is ReducerOp.RESET:
+        return []
 
     # Check for existing items with same ID and append node_ids, otherwise append new item
+    index_by_id = {item.id: i for i, item in enumerate(original)}
     for new_item in new:
-        existing_item_index = None
-        for i, existing_item in enumerate(original):
-            if existing_item.id == new_item.id:
-                existing_item_index = i
-                break
+        existing_item_index = index_by_id.get(new_item.id)
 
         if existing_item_index is not None:
-            # Append new node_ids to existing item
+            # Append new node_ids to existing item, replacing entries for the same node
             if not new_item.classified_as:
                 continue
+            existing_item = original[existing_item_index]
+            if existing_item.classified_as is None:
+                existing_item.classified_as = []
+            node_id_to_index = {
+                node_and_confidence.node_id: i
+                for i, node_and_confidence in enumerate(existing_item.classified_as)
+            }
             for node_and_confidence in new_item.classified_as:
-                if original[existing_item_index].classified_as is None:
-                    original[existing_item_index].classified_as = [node_and_confidence]
-                    continue
-
-                original_node_ids = [
-                    original_node_and_confidence.node_id
-                    for original_node_and_confidence in original[
-                        existing_item_index
-                    ].classified_as  # type: ignore
-                ]
-
-                if node_and_confidence.node_id not in original_node_ids:
-                    original[existing_item_index].classified_as.append(  # type: ignore
-                        node_and_confidence
-                    )
+                i = node_id_to_index.get(node_and_confidence.node_id)
+                if i is not None:
+                    existing_item.classified_as[i] = node_and_confidence
                 else:
-                    # If the node_id is already in the existing item, we replace it.
-                    original[existing_item_index].classified_as = [
-                        original_node_and_confidence
-                        for original_node_and_confidence in original[
-                            existing_item_index
-                        ].classified_as  # type: ignore
-                        if original_node_and_confidence.node_id
-                        != node_and_confidence.node_id
-                    ] + [node_and_confidence]
+                    node_id_to_index[node_and_confidence.node_id] = len(
+                        existing_item.classified_as
+                    )
+                    existing_item.classified_as.append(node_and_confidence)
         else:
             # Append new item
+            index_by_id[new_item.id] = len(original)
             original.append(new_item)
 
     return original
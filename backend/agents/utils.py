@@ -1,13 +1,15 @@
 import random
 import asyncio
 import logging
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
 from bson import ObjectId
-from typing import Any, Type, Set, Union, Optional, Tuple, Callable
+from typing import Any, Iterable, Type, Set, Union, Optional, Tuple, Callable
 from pydantic import BaseModel, create_model
 from pydantic_core import PydanticUndefined
 
-from app.db.database import get_user_items_collection
-from app.models.item import ItemInDB
+from app.db.database import get_items_collection
 
 from agents.state import ItemState, ClassNodeState
 from agents.llm_factory import AIModel
@@ -20,6 +22,18 @@ logger = logging.getLogger(__name__)
 ########################################################
 
 
+ABBREVIATED_ID_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+ABBREVIATED_ID_LENGTH = 4
+
+
+def _encode_abbreviated_id(number: int) -> str:
+    chars = []
+    for _ in range(ABBREVIATED_ID_LENGTH):
+        number, index = divmod(number, len(ABBREVIATED_ID_ALPHABET))
+        chars.append(ABBREVIATED_ID_ALPHABET[index])
+    return "".join(chars)
+
+
 def abbreviate_node_ids(
     nodes: list[ClassNodeState],
 ) -> tuple[list[ClassNodeState], dict[str, str], dict[str, str]]:
@@ -28,35 +42,43 @@ def abbreviate_node_ids(
     if any(node.id is None for node in nodes):
         raise ValueError("Node can't have None id: ", nodes)
 
-    nodes_copy = [node.model_copy() for node in nodes]
+    # Node ids can't be None (checked above); parent ids can be None or "" for the root.
+    all_ids = list(
+        {node.id for node in nodes}
+        | {node.parent_node_id for node in nodes if node.parent_node_id}
+    )
 
-    node_ids = [node.id for node in nodes_copy if node.id is not None]
-    parent_node_ids = [
-        node.parent_node_id for node in nodes_copy if node.parent_node_id is not None
-    ]
-    all_ids = set(node_ids + parent_node_ids)
-    all_ids = [id for id in all_ids if id is not None and id != ""]
+    # Sample distinct numbers without replacement and encode them as 4 character ids,
+    # so there is no collision to retry on.
+    abbreviated_id_numbers = random.Random().sample(
+        range(len(ABBREVIATED_ID_ALPHABET) ** ABBREVIATED_ID_LENGTH), len(all_ids)
+    )
 
-    new_node_ids = []
     original_id_to_abbreviated_map = {}
     abbreviated_id_to_original_map = {}
-    for node_id in all_ids:
-        # pick random 4 characters from the node_id
-        while True:
-            new_node_id = "".join(random.choices(node_id, k=4))
-            if new_node_id not in new_node_ids:
-                new_node_ids.append(new_node_id)
-                original_id_to_abbreviated_map[node_id] = new_node_id
-                abbreviated_id_to_original_map[new_node_id] = node_id
-                break
-
-    for node in nodes_copy:
-        if node.id is not None:
-            node.id = original_id_to_abbreviated_map[node.id]
-        if node.parent_node_id is not None and node.parent_node_id != "":
-            node.parent_node_id = original_id_to_abbreviated_map[node.parent_node_id]
+    for node_id, number in zip(all_ids, abbreviated_id_numbers):
+        new_node_id = _encode_abbreviated_id(number)
+        original_id_to_abbreviated_map[node_id] = new_node_id
+        abbreviated_id_to_original_map[new_node_id] = node_id
+
+    # Copy each node once with both ids replaced; empty parent ids are not in the map and stay as is.
+    abbreviated_nodes = [
+        node.model_copy(
+            update={
+                "id": original_id_to_abbreviated_map[node.id],
+                "parent_node_id": original_id_to_abbreviated_map.get(
+                    node.parent_node_id, node.parent_node_id
+                ),
+            }
+        )
+        for node in nodes
+    ]
 
-    return nodes_copy, abbreviated_id_to_original_map, original_id_to_abbreviated_map
+    return (
+        abbreviated_nodes,
+        abbreviated_id_to_original_map,
+        original_id_to_abbreviated_map,
+    )
 
 
 def restore_abbreviated_node_ids(
@@ -65,33 +87,33 @@ def restore_abbreviated_node_ids(
     if not nodes:
         raise ValueError("Nodes are empty")
 
-    nodes_copy = [node.model_copy() for node in nodes]
+    # Known short ids map to their original ids; unknown ones (new nodes) get a new ObjectId
+    # that is remembered so that children referring to them get the same id.
+    short_id_to_long_id_map = dict(shortened_id_to_original_map)
+
+    def resolve(short_id: str) -> str:
+        long_id = short_id_to_long_id_map.get(short_id)
+        if long_id is None:
+            long_id = str(ObjectId())
+            short_id_to_long_id_map[short_id] = long_id
+        return long_id
 
-    new_short_id_to_long_id_map = {}
-    for node in nodes_copy:
+    restored_nodes = []
+    for node in nodes:
         if node.id is None:
             raise ValueError(f"Node id is None: {node}")
 
-        if node.id in shortened_id_to_original_map:
-            node.id = shortened_id_to_original_map[node.id]
-        elif node.id in new_short_id_to_long_id_map:
-            node.id = new_short_id_to_long_id_map[node.id]
-        else:
-            new_node_id = str(ObjectId())
-            new_short_id_to_long_id_map[node.id] = new_node_id
-            node.id = new_node_id
-
-        if node.parent_node_id is not None and node.parent_node_id != "":
-            if node.parent_node_id in shortened_id_to_original_map:
-                node.parent_node_id = shortened_id_to_original_map[node.parent_node_id]
-            elif node.parent_node_id in new_short_id_to_long_id_map:
-                node.parent_node_id = new_short_id_to_long_id_map[node.parent_node_id]
-            else:
-                new_parent_node_id = str(ObjectId())
-                new_short_id_to_long_id_map[node.parent_node_id] = new_parent_node_id
-                node.parent_node_id = new_parent_node_id
+        node_id = resolve(node.id)
+        parent_node_id = node.parent_node_id
+        if parent_node_id is not None and parent_node_id != "":
+            parent_node_id = resolve(parent_node_id)
+
+        # Copy each node once with both ids replaced instead of copying then mutating it.
+        restored_nodes.append(
+            node.model_copy(update={"id": node_id, "parent_node_id": parent_node_id})
+        )
 
-    return nodes_copy
+    return restored_nodes
 
 
 ########################################################
@@ -112,10 +134,8 @@ def format_batch_items(
         items = [items]
 
     formatted_string = "\n".join(
-        [
-            f"<Item{f' id={item.id}' if include_id else ''}>{item.content}</Item>"
-            for item in items
-        ]
+        f"<Item{f' id={item.id}' if include_id else ''}>{item.content}</Item>"
+        for item in items
     )
     if formatted_string.strip() == "":
         raise ValueError("Items are empty")
@@ -127,34 +147,116 @@ def format_batch_items(
 ########################################################
 
 
+class ItemLoader:
+    """
+    Batches item content fetches for a single formatting request.
+
+    Ids requested by concurrent coroutines in the same event loop tick are collected and fetched
+    with one `$in` query, so formatting K nodes costs one round-trip instead of K.
+    Only the content field is fetched, as raw documents without ItemInDB validation.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self._futures: dict[str, asyncio.Future] = {}
+        self._queue: list[str] = []
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def load_many(self, item_ids: list[str]) -> list[str]:
+        """Returns the contents of the items with the given ids, skipping the ones that don't exist."""
+        contents = await asyncio.gather(*[self._load(item_id) for item_id in item_ids])
+        return [content for content in contents if content is not None]
+
+    async def load_content_map(self, item_ids: list[str]) -> dict[str, str]:
+        """Returns {item_id: content} for the given ids, skipping the ones that don't exist."""
+        contents = await asyncio.gather(*[self._load(item_id) for item_id in item_ids])
+        return {
+            item_id: content
+            for item_id, content in zip(item_ids, contents)
+            if content is not None
+        }
+
+    def _load(self, item_id: str) -> asyncio.Future:
+        # Ids shared between nodes, e.g. siblings with the same examples, are fetched and
+        # converted to ObjectId only once per loader.
+        if item_id in self._futures:
+            return self._futures[item_id]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[item_id] = future
+        self._queue.append(item_id)
+        if len(self._queue) == 1:
+            loop.call_soon(self._schedule_flush)
+        return future
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self) -> None:
+        item_ids, self._queue = self._queue, []
+        try:
+            cursor = get_items_collection().find(
+                {
+                    "user_id": self.user_id,
+                    "_id": {"$in": list(map(ObjectId, item_ids))},
+                },
+                projection={"content": 1},
+            )
+            contents_by_id = {}
+            async for item in cursor:
+                contents_by_id[str(item["_id"])] = item["content"]
+        except Exception as e:
+            for item_id in item_ids:
+                self._futures[item_id].set_exception(e)
+            return
+
+        for item_id in item_ids:
+            self._futures[item_id].set_result(contents_by_id.get(item_id))
+
+
 async def format_node_examples(
-    example_item_ids: list[str], num_examples: int, max_length: int, user_id: str
+    example_item_ids: list[str],
+    num_examples: int,
+    max_length: int,
+    user_id: str,
+    item_loader: Optional[ItemLoader] = None,
 ) -> str:
     # fetch items from the database
-    item_collection = get_user_items_collection(user_id)
-    cursor = item_collection.find(
-        {"_id": {"$in": [ObjectId(id) for id in example_item_ids]}}
+    if item_loader is None:
+        item_loader = ItemLoader(user_id)
+    contents = await item_loader.load_many(example_item_ids)
+
+    return _format_examples(contents, num_examples, max_length)
+
+
+_WHITESPACE_TO_SPACE_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+
+def _format_examples(
+    contents: Iterable[str], num_examples: int, max_length: int
+) -> str:
+    # Stops consuming the contents after num_examples, so callers can pass a generator.
+    return "\n".join(
+        f"- {_clean_example_content(content, max_length)}"
+        for content in islice(contents, num_examples)
     )
-    items: list[ItemInDB] = [ItemInDB(**item) async for item in cursor]
-    # print(f"Fetched {len(items)} items from db with ids: {example_item_ids}")
-    # print(f"Items: {items}")
 
-    formatted_examples = []
-    for item in items[:num_examples]:
-        # Truncate content if it exceeds max_length
-        truncated_content = item.content[:max_length]
 
-        # Replace newlines with spaces and strip whitespace
-        cleaned_content = truncated_content.replace("\n", " ").strip()
+def _clean_example_content(content: str, max_length: int) -> str:
+    # Truncate content if it exceeds max_length
+    truncated_content = content[:max_length]
 
-        # Add ellipsis if content was truncated
-        if len(item.content) > max_length:
-            cleaned_content += "..."
+    # Replace newlines and tabs with spaces and strip whitespace
+    cleaned_content = truncated_content.translate(_WHITESPACE_TO_SPACE_TABLE).strip()
 
-        formatted_examples.append(f"- {cleaned_content}")
+    # Add ellipsis if content was truncated
+    if len(content) > max_length:
+        cleaned_content += "..."
 
-    formatted_string = "\n".join(formatted_examples)
-    return formatted_string
+    return cleaned_content
 
 
 async def format_single_node(
@@ -163,8 +265,26 @@ async def format_single_node(
     include_parent_node_id: bool = True,
     num_examples: int = 10,
     max_length: int = 1000,
+    item_loader: Optional[ItemLoader] = None,
 ) -> str:
     """Format a single ClassNode into a readable string representation."""
+    return await format_class_nodes(
+        node, num_examples, max_length, user_id, include_parent_node_id, item_loader
+    )
+
+
+def _few_shot_item_ids(node: ClassNodeState) -> list[str]:
+    return [item.item_id for item in node.items or [] if item.used_as_few_shot_example]
+
+
+def _format_node(
+    node: ClassNodeState,
+    few_shot_item_ids: list[str],
+    example_contents_by_id: dict[str, str],
+    include_parent_node_id: bool,
+    num_examples: int,
+    max_length: int,
+) -> str:
     lines = [
         f"Id: {node.id}",
     ]
@@ -182,13 +302,13 @@ async def format_single_node(
 
     # Add few shot items if they exist
     if num_examples > 0:
-        few_shot_item_ids = [
-            item.item_id for item in node.items or [] if item.used_as_few_shot_example
-        ]
         if few_shot_item_ids:
-            formatted_examples = await format_node_examples(
-                few_shot_item_ids, num_examples, max_length, user_id
+            contents = (
+                example_contents_by_id[item_id]
+                for item_id in few_shot_item_ids
+                if item_id in example_contents_by_id
             )
+            formatted_examples = _format_examples(contents, num_examples, max_length)
             lines.append(f"Exemplary Items:\n{formatted_examples}")
 
     return "\n".join(lines)
@@ -200,19 +320,40 @@ async def format_class_nodes(
     max_length: int,
     user_id: str,
     include_parent_node_id: bool = True,
+    item_loader: Optional[ItemLoader] = None,
 ) -> str:
     if isinstance(nodes, ClassNodeState):
         nodes = [nodes]
 
+    # The few shot ids are read from the nodes once per call, since items and their
+    # used_as_few_shot_example flags are updated in place.
+    few_shot_item_ids_by_node = [
+        _few_shot_item_ids(node) if num_examples > 0 else [] for node in nodes
+    ]
+
+    # Fetch the examples of all nodes with one await, then format the nodes synchronously.
+    example_contents_by_id = {}
+    if num_examples > 0:
+        few_shot_item_ids = [
+            item_id for ids in few_shot_item_ids_by_node for item_id in ids
+        ]
+        if few_shot_item_ids:
+            if item_loader is None:
+                item_loader = ItemLoader(user_id)
+            example_contents_by_id = await item_loader.load_content_map(
+                few_shot_item_ids
+            )
+
     return "\n\n".join(
-        await asyncio.gather(
-            *[
-                format_single_node(
-                    node, user_id, include_parent_node_id, num_examples, max_length
-                )
-                for node in nodes
-            ]
+        _format_node(
+            node,
+            few_shot_item_ids,
+            example_contents_by_id,
+            include_parent_node_id,
+            num_examples,
+            max_length,
         )
+        for node, few_shot_item_ids in zip(nodes, few_shot_item_ids_by_node)
     )
 
 
@@ -226,17 +367,21 @@ async def format_children_nodes_from_parent_node_ids(
     if isinstance(parent_node_ids, str):
         parent_node_ids = [parent_node_ids]
 
+    node_by_id = {}
+    children_by_parent_id = {}
+    for node in nodes:
+        node_by_id.setdefault(node.id, node)
+        children_by_parent_id.setdefault(node.parent_node_id, []).append(node)
+
     nodes_to_format = []
     for parent_node_id in parent_node_ids:
         # Find the parent node
-        parent_node = next((node for node in nodes if node.id == parent_node_id), None)
+        parent_node = node_by_id.get(parent_node_id)
         if parent_node is None:
             continue
 
         # Find all children nodes for this parent
-        children_nodes = [
-            node for node in nodes if node.parent_node_id == parent_node_id
-        ]
+        children_nodes = children_by_parent_id.get(parent_node_id, [])
 
         if children_nodes:  # Only add if there are children
             nodes_to_format.append(
@@ -246,18 +391,41 @@ async def format_children_nodes_from_parent_node_ids(
     if len(nodes_to_format) == 0:
         raise ValueError("No nodes to format")
 
+    # Format every parent and children group concurrently with a shared loader,
+    # so all their examples are fetched in a single query.
+    item_loader = ItemLoader(user_id)
+    formatted_groups = await asyncio.gather(
+        *[
+            format_class_nodes(
+                group,
+                num_examples=num_examples,
+                max_length=max_length,
+                include_parent_node_id=False,
+                user_id=user_id,
+                item_loader=item_loader,
+            )
+            for parent_children_dict in nodes_to_format
+            for group in (
+                parent_children_dict["parent_node"],
+                parent_children_dict["children_nodes"],
+            )
+        ]
+    )
+
     formatted_string = "\n\n".join(
         [
             f"""
 <ParentNode>
-{await format_class_nodes(parent_children_dict["parent_node"], num_examples=num_examples, max_length=max_length, include_parent_node_id=False, user_id=user_id)}
+{formatted_parent}
 </ParentNode>
 
 <ChildNodes>
-{await format_class_nodes(parent_children_dict["children_nodes"], num_examples=num_examples, max_length=max_length, include_parent_node_id=False, user_id=user_id)}
+{formatted_children}
 </ChildNodes>
             """.strip()
-            for parent_children_dict in nodes_to_format
+            for formatted_parent, formatted_children in zip(
+                formatted_groups[::2], formatted_groups[1::2]
+            )
         ]
     )
 
@@ -272,7 +440,13 @@ async def format_children_nodes_from_parent_node_ids(
 ########################################################
 
 
+def build_parent_set(nodes: list[ClassNodeState]) -> frozenset[str]:
+    """Ids of the nodes that have at least one child."""
+    return frozenset(node.parent_node_id for node in nodes if node.parent_node_id)
+
+
 def has_children_nodes(nodes: list[ClassNodeState], parent_node_id: str) -> bool:
+    """Scans all nodes. When checking many parent ids, use build_parent_set once instead."""
     return any(node.parent_node_id == parent_node_id for node in nodes)
 
 
@@ -309,18 +483,9 @@ def choose_top_node_ids_from_classification_results(
     """
 
     # Count frequency of each node across all classification results
-    node_frequency_counts = {}
+    node_frequency_counts = Counter()
     for classification_result in classification_results:
-        if not classification_result.node_ids:
-            node_frequency_counts["empty"] = node_frequency_counts.get("empty", 0) + 1
-            continue
-        for node_id in classification_result.node_ids:
-            node_frequency_counts[node_id] = node_frequency_counts.get(node_id, 0) + 1
-
-    # Sort nodes by frequency (highest to lowest)
-    sorted_nodes_by_frequency = dict(
-        sorted(node_frequency_counts.items(), key=lambda item: item[1], reverse=True)
-    )
+        node_frequency_counts.update(classification_result.node_ids or ["empty"])
 
     total_classifications = len(classification_results)
     min_count = int(total_classifications * majority_threshold + 0.5)  # round up
@@ -328,7 +493,8 @@ def choose_top_node_ids_from_classification_results(
     # Filter nodes based on thresholds
     selected_node_and_confidence_score = []
     top_node_included = False
-    for node_id, frequency_count in sorted_nodes_by_frequency.items():
+    # Iterate nodes by frequency (highest to lowest)
+    for node_id, frequency_count in node_frequency_counts.most_common():
         confidence_score = frequency_count / total_classifications
         # Always include the top-ranked node
         if not top_node_included:
@@ -368,12 +534,21 @@ def exclude_fields(
         - new_model_class: New Pydantic model class with excluded fields
         - converter_function: Function to convert new_model instance to original_model instance
     """
-    if isinstance(exclude_fields, list):
-        exclude_fields = set(exclude_fields)
-
     if new_model_name is None:
         new_model_name = f"{original_model.__name__}V2"
 
+    # The generated model and converter only depend on the arguments, so they are built once.
+    return _build_model_without_fields(
+        original_model, frozenset(exclude_fields), new_model_name
+    )
+
+
+@lru_cache(maxsize=None)
+def _build_model_without_fields(
+    original_model: Type[BaseModel],
+    exclude_fields: frozenset[str],
+    new_model_name: str,
+) -> Tuple[Type[BaseModel], Callable]:
     # Get all fields from the original model
     original_fields = original_model.model_fields
 
@@ -1,13 +1,15 @@
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from bson import ObjectId
+from bson.errors import InvalidId
 
 from app.core.security import verify_token
 from app.db.database import get_db
 from app.models.user import UserInDB
-from motor.core import AgnosticDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -15,6 +17,24 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
+@lru_cache(maxsize=8192)
+def as_oid(value: str) -> ObjectId:
+    """Convert a hex id string to an ObjectId, parsing each distinct id once.
+
+    ObjectId is immutable, so cached instances are safe to share. Raises
+    InvalidId for malformed ids, like ObjectId() itself.
+    """
+    return ObjectId(value)
+
+
+def get_taxonomy_oid(taxonomy_id: str) -> ObjectId:
+    """Validate the taxonomy_id path parameter and convert it to an ObjectId"""
+    try:
+        return as_oid(taxonomy_id)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid taxonomy ID")
+
+
 async def get_current_user_id(token: Optional[str] = Depends(oauth2_scheme)) -> str:
     """Extract and verify user ID from JWT token"""
     if not token:
@@ -35,11 +55,11 @@ async def get_current_user_id(token: Optional[str] = Depends(oauth2_scheme)) ->
 
 
 async def get_current_user(
-    user_id: str = Depends(get_current_user_id), db: AgnosticDatabase = Depends(get_db)
+    user_id: str = Depends(get_current_user_id), db: AsyncDatabase = Depends(get_db)
 ) -> UserInDB:
     """Get current authenticated user"""
 
-    user_doc = await db.users.find_one({"_id": ObjectId(user_id)})
+    user_doc = await db.users.find_one({"_id": as_oid(user_id)})
     if not user_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -61,8 +81,6 @@ async def get_current_active_superuser(
     return current_user
 
 
-def get_user_items_collection(
-    user_id: str = Depends(get_current_user_id), db: AgnosticDatabase = Depends(get_db)
-):
-    """Get the items collection for a specific user"""
-    return db[f"items_{user_id}"]
+def get_items_collection(db: AsyncDatabase = Depends(get_db)):
+    """Get the items collection shared by all users (scope queries by user_id)"""
+    return db.items
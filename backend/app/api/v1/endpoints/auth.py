@@ -12,7 +12,8 @@ from app.core.security import create_access_token, create_refresh_token
 from app.db.database import get_db
 from app.models.user import UserInDB
 from app.schemas.auth import Token, GoogleAuthUrl, RefreshTokenRequest
-from motor.core import AgnosticDatabase
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo import ReturnDocument
 
 
 router = APIRouter()
@@ -31,6 +32,16 @@ oauth.register(
     server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
     client_kwargs={"scope": "openid email profile"},
 )
+google_client = oauth.create_client("google")
+
+
+async def load_google_server_metadata():
+    """Fetch Google's OpenID discovery document at startup so the first login doesn't wait for it."""
+    try:
+        await google_client.load_server_metadata()  # type: ignore
+    except Exception as e:
+        # authlib fetches it lazily on the first login if this fails
+        print(f"Failed to load Google OAuth server metadata: {e}")
 
 
 # @router.get("/google/login", response_model=GoogleAuthUrl)
@@ -46,17 +57,13 @@ oauth.register(
 async def google_login_redirect(request: Request) -> Any:
     """Redirect to Google OAuth login"""
     redirect_uri = settings.GOOGLE_REDIRECT_URI
-    google_client = oauth.create_client("google")
     return await google_client.authorize_redirect(request, redirect_uri)  # type: ignore
 
 
 @router.get("/google/callback")
-async def google_callback(
-    request: Request, db: AgnosticDatabase = Depends(get_db)
-) -> Any:
+async def google_callback(request: Request, db: AsyncDatabase = Depends(get_db)) -> Any:
     """Handle Google OAuth callback"""
     try:
-        google_client = oauth.create_client("google")
         token = await google_client.authorize_access_token(request)  # type: ignore
     except Exception as e:
         # Redirect to frontend with error
@@ -76,36 +83,39 @@ async def google_callback(
             )
             user_info = response.json()
 
-    # Check if user exists using 'sub' field (OpenID Connect subject identifier)
-    # This is Google's unique identifier for the user
-    existing_user = await db.users.find_one({"google_id": user_info["sub"]})
-
-    if existing_user:
-        # Update user info
-        await db.users.update_one(
-            {"_id": existing_user["_id"]},
-            {
-                "$set": {
-                    "name": user_info.get("name", existing_user["name"]),
-                    "picture": user_info.get("picture", existing_user.get("picture")),
-                }
-            },
-        )
-        user_id = str(existing_user["_id"])
-    else:
-        # Create new user
-        new_user = UserInDB(
-            email=user_info["email"],
-            name=user_info.get("name", user_info["email"].split("@")[0]),
-            google_id=user_info["sub"],
-            picture=user_info.get("picture"),
-        )
+    # Find the user by 'sub' field (OpenID Connect subject identifier), which is Google's
+    # unique identifier for the user, and update it or create it in a single round trip.
+    new_user = UserInDB(
+        email=user_info["email"],
+        name=user_info.get("name", user_info["email"].split("@")[0]),
+        google_id=user_info["sub"],
+        picture=user_info.get("picture"),
+    )
+    fields_to_update = {
+        field: user_info[field] for field in ("name", "picture") if field in user_info
+    }
+    fields_on_insert = {
+        key: value
+        for key, value in new_user.model_dump(
+            by_alias=True, context={"keep_objectid": True}
+        ).items()
+        if key not in fields_to_update
+    }
 
-        result = await db.users.insert_one(
-            new_user.model_dump(by_alias=True, context={"keep_objectid": True})
-        )
-        print("New user created: result")
-        user_id = str(result.inserted_id)
+    update: dict[str, Any] = {"$setOnInsert": fields_on_insert}
+    if fields_to_update:
+        update["$set"] = fields_to_update
+
+    user = await db.users.find_one_and_update(
+        {"google_id": user_info["sub"]},
+        update,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 1},
+    )
+    if user["_id"] == new_user.id:
+        print(f"New user created: {user['_id']}")
+    user_id = str(user["_id"])
 
     # Create tokens
     access_token = create_access_token(subject=user_id)
@@ -123,7 +133,7 @@ async def google_callback(
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
-    request: RefreshTokenRequest, db: AgnosticDatabase = Depends(get_db)
+    request: RefreshTokenRequest, db: AsyncDatabase = Depends(get_db)
 ) -> Any:
     """Refresh access token using refresh token"""
     from app.core.security import verify_token
@@ -137,7 +147,9 @@ async def refresh_token(
 
     # Verify user still exists and is active
     try:
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one(
+            {"_id": ObjectId(user_id)}, projection={"_id": 1, "is_active": 1}
+        )
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
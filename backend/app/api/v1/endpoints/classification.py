@@ -1,12 +1,16 @@
-from typing import Any
+import asyncio
+import logging
+import uuid
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from bson import ObjectId
-from datetime import datetime
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+from datetime import datetime, timedelta
 import dspy
 
 from app.api.deps import get_current_user
 from app.models.user import UserInDB
-from app.models.item import ItemInDB
 from app.models.taxonomy import ClassifierState
 from app.models.node import NodeInDB
 from app.schemas.classification import (
@@ -24,18 +28,79 @@ from app.schemas.classification import (
     OptimizePromptWithDspyRequest,
     RemoveClassificationItemsOnlyRequest,
 )
-from app.db.database import get_db
+from app.db.database import (
+    get_db,
+    create_taxonomy_nodes_indexes,
+    get_cached_taxonomy,
+    get_taxonomy_nodes_collection,
+    invalidate_cached_taxonomy,
+)
 from app.services.classifier_service import ClassifierService
 from app.websocket.manager import connection_manager
-from motor.core import AgnosticDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from agents.state import Taxonomy
-from app.services.dspy_optimizer import DspyOptimizer
+from app.services.dspy_optimizer import run_dspy_optimizer
 from app.models.taxonomy import TaxonomyInDB
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Sessions live in MongoDB rather than in process memory so that every worker can
+# report on and cancel them. The worker running a session polls for cancel requests.
+SESSION_TTL = timedelta(days=1)
+SESSION_CANCEL_POLL_SECONDS = 2.0
+
 
-active_sessions = {}
+async def _create_session(
+    db: AsyncDatabase, user_id: str, session_type: str, taxonomy_id: str
+) -> str:
+    session_id = uuid.uuid4().hex
+    await db.sessions.insert_one(
+        {
+            "_id": session_id,
+            "user_id": user_id,
+            "type": session_type,
+            "taxonomy_id": taxonomy_id,
+            "status": "running",
+            "cancel_requested": False,
+            "expires_at": datetime.utcnow() + SESSION_TTL,
+        }
+    )
+    return session_id
+
+
+async def _run_session(
+    db: AsyncDatabase, session_id: str, work: Callable[[], Awaitable]
+) -> None:
+    """Run a session's work, cancelling it if a cancel request shows up in the DB."""
+    task = asyncio.ensure_future(work())
+    status = "failed"
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=SESSION_CANCEL_POLL_SECONDS)
+            if done:
+                task.result()
+                status = "completed"
+                break
+            try:
+                session = await db.sessions.find_one(
+                    {"_id": session_id}, projection={"cancel_requested": 1}
+                )
+            except Exception as e:
+                # A failed poll must not kill the work; try again on the next poll
+                logger.warning(f"Session {session_id} cancel poll failed: {e}")
+                continue
+            if session and session["cancel_requested"]:
+                task.cancel()
+                status = "cancelled"
+                break
+    except Exception as e:
+        logger.error(f"Session {session_id} failed: {e}")
+    finally:
+        if not task.done():
+            task.cancel()
+        await db.sessions.update_one({"_id": session_id}, {"$set": {"status": status}})
 
 
 @router.post("/classify", response_model=ClassificationResponse)
@@ -43,22 +108,20 @@ async def classify_batch(
     request: ClassificationRequest,
     background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Start classification of a batch of items"""
-    # Verify taxonomy exists and belongs to user
-    taxonomy_doc = await db.taxonomies.find_one(
-        {"_id": ObjectId(request.taxonomy_id), "user_id": str(current_user.id)}
+    # Verify taxonomy exists and belongs to user, and check if nodes exist for it
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+    taxonomy_doc, any_node = await asyncio.gather(
+        get_cached_taxonomy(db, request.taxonomy_id, str(current_user.id)),
+        nodes_collection.find_one({}, projection={"_id": 1}),
     )
 
     if not taxonomy_doc:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
 
-    # Check if nodes exist for taxonomy
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
-    nodes_count = await nodes_collection.count_documents({})
-
-    if nodes_count == 0:
+    if any_node is None:
         raise HTTPException(
             status_code=400,
             detail="No nodes found for taxonomy. Create initial nodes first.",
@@ -72,27 +135,37 @@ async def classify_batch(
         db,
     )
 
+    session_id = await _create_session(
+        db, str(current_user.id), "classification", request.taxonomy_id
+    )
+
     # Using background tasks will allow use to return the response immediately, while the long running task is running in the background. The progress of the task will be delivered via websocket.
     background_tasks.add_task(
-        classifier_service.classify_batch,
-        taxonomy_id=request.taxonomy_id,
-        taxonomy=Taxonomy(
-            id=str(taxonomy_doc["_id"]),
-            name=taxonomy_doc["name"],
-            aspect=taxonomy_doc["aspect"],
+        _run_session,
+        db,
+        session_id,
+        partial(
+            classifier_service.classify_batch,
+            taxonomy_id=request.taxonomy_id,
+            taxonomy=Taxonomy(
+                id=str(taxonomy_doc["_id"]),
+                name=taxonomy_doc["name"],
+                aspect=taxonomy_doc["aspect"],
+            ),
+            batch_size=request.batch_size or 2,
+            user_id=str(current_user.id),
+            db=db,
+            models=request.models,
+            majority_threshold=request.majority_threshold,
+            total_invocations=request.total_invocations,
         ),
-        batch_size=request.batch_size or 2,
-        user_id=str(current_user.id),
-        db=db,
-        models=request.models,
-        majority_threshold=request.majority_threshold,
-        total_invocations=request.total_invocations,
     )
 
     return ClassificationResponse(
         message="Classification started",
         items_classified=0,
         status="running",
+        session_id=session_id,
     )
 
 
@@ -101,22 +174,20 @@ async def examine_nodes(
     request: ExaminationRequest,
     background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Start examination of nodes that need improvement"""
-    # Verify taxonomy exists and belongs to user
-    taxonomy_doc = await db.taxonomies.find_one(
-        {"_id": ObjectId(request.taxonomy_id), "user_id": str(current_user.id)}
+    # Verify taxonomy exists and belongs to user, and check if nodes exist
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+    taxonomy_doc, any_node = await asyncio.gather(
+        get_cached_taxonomy(db, request.taxonomy_id, str(current_user.id)),
+        nodes_collection.find_one({}, projection={"_id": 1}),
     )
 
     if not taxonomy_doc:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
 
-    # Check if nodes exist
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
-    nodes_count = await nodes_collection.count_documents({})
-
-    if nodes_count == 0:
+    if any_node is None:
         raise HTTPException(status_code=400, detail="No nodes found for taxonomy")
 
     # Create classifier service with state loaded from DB
@@ -127,23 +198,33 @@ async def examine_nodes(
         db,
     )
 
+    session_id = await _create_session(
+        db, str(current_user.id), "examination", request.taxonomy_id
+    )
+
     background_tasks.add_task(
-        classifier_service.examine_nodes,
-        taxonomy_id=request.taxonomy_id,
-        taxonomy=Taxonomy(
-            id=str(taxonomy_doc["_id"]),
-            name=taxonomy_doc["name"],
-            aspect=taxonomy_doc["aspect"],
+        _run_session,
+        db,
+        session_id,
+        partial(
+            classifier_service.examine_nodes,
+            taxonomy_id=request.taxonomy_id,
+            taxonomy=Taxonomy(
+                id=str(taxonomy_doc["_id"]),
+                name=taxonomy_doc["name"],
+                aspect=taxonomy_doc["aspect"],
+            ),
+            user_id=str(current_user.id),
+            db=db,
+            force_node_ids=request.force_examine_node_ids,
         ),
-        user_id=str(current_user.id),
-        db=db,
-        force_node_ids=request.force_examine_node_ids,
     )
 
     return ExaminationResponse(
         message="Node examination started",
         nodes_examined=[],
         status="running",
+        session_id=session_id,
     )
 
 
@@ -151,37 +232,41 @@ async def examine_nodes(
 async def remove_classification(
     request: RemoveClassificationRequest,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Remove a classification from an item"""
-    # Remove the classification from the item
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    await user_items_collection.update_one(
-        {
-            "_id": ObjectId(request.item_id),
-            f"classified_as.{request.taxonomy_id}": {
-                "$exists": True,
-                "$ne": None,
-                "$type": "array",
-            },
-        },
-        {
-            "$pull": {
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+
+    await asyncio.gather(
+        # Remove the classification from the item
+        user_items_collection.update_one(
+            {
+                "user_id": user_id,
+                "_id": ObjectId(request.item_id),
                 f"classified_as.{request.taxonomy_id}": {
-                    "node_id": request.node_id_to_remove
+                    "$exists": True,
+                    "$ne": None,
+                    "$type": "array",
+                },
+            },
+            {
+                "$pull": {
+                    f"classified_as.{request.taxonomy_id}": {
+                        "node_id": request.node_id_to_remove
+                    }
                 }
-            }
-        },
-    )
-
-    # Remove the classification from the node
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
-    await nodes_collection.update_one(
-        {
-            "_id": ObjectId(request.node_id_to_remove),
-            "items": {"$exists": True, "$ne": None, "$type": "array"},
-        },
-        {"$pull": {"items": {"item_id": request.item_id}}},
+            },
+        ),
+        # Remove the classification from the node
+        nodes_collection.update_one(
+            {
+                "_id": ObjectId(request.node_id_to_remove),
+                "items": {"$exists": True, "$ne": None, "$type": "array"},
+            },
+            {"$pull": {"items": {"item_id": request.item_id}}},
+        ),
     )
 
     return RemoveClassificationResponse(
@@ -194,27 +279,48 @@ async def remove_classification(
 async def remove_classification_items_only(
     request: RemoveClassificationItemsOnlyRequest,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
-    """Remove a classification from an item"""
-    # Remove the classification from the item
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    await user_items_collection.update_many(
-        {
-            "_id": {"$in": [ObjectId(item_id) for item_id in request.item_ids]},
-            f"classified_as.{request.taxonomy_id}": {
-                "$exists": True,
-                "$ne": None,
-                "$type": "array",
-            },
-        },
-        {
-            "$pull": {
+    """Remove a classification from many items at once"""
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+
+    # The item update is scoped to the caller's items, so it runs alongside the
+    # ownership check; the node update waits for it.
+    taxonomy_doc, _ = await asyncio.gather(
+        get_cached_taxonomy(db, request.taxonomy_id, user_id),
+        # Remove the classification from the items
+        user_items_collection.update_many(
+            {
+                "user_id": user_id,
+                "_id": {"$in": [ObjectId(item_id) for item_id in request.item_ids]},
                 f"classified_as.{request.taxonomy_id}": {
-                    "node_id": request.node_id_to_remove
+                    "$exists": True,
+                    "$ne": None,
+                    "$type": "array",
+                },
+            },
+            {
+                "$pull": {
+                    f"classified_as.{request.taxonomy_id}": {
+                        "node_id": request.node_id_to_remove
+                    }
                 }
-            }
+            },
+        ),
+    )
+
+    if not taxonomy_doc:
+        raise HTTPException(status_code=404, detail="Taxonomy not found")
+
+    # Remove the items from the node, if it still exists
+    await nodes_collection.update_one(
+        {
+            "_id": ObjectId(request.node_id_to_remove),
+            "items": {"$exists": True, "$ne": None, "$type": "array"},
         },
+        {"$pull": {"items": {"item_id": {"$in": request.item_ids}}}},
     )
 
     return RemoveClassificationResponse(
@@ -227,15 +333,16 @@ async def remove_classification_items_only(
 async def add_classification(
     request: AddClassificationRequest,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Manually add a classification to an item"""
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
 
     # Add the classification to the item
     await user_items_collection.update_one(
-        {"_id": ObjectId(request.item_id)},
+        {"user_id": user_id, "_id": ObjectId(request.item_id)},
         {
             "$push": {
                 f"classified_as.{request.taxonomy_id}": {
@@ -263,113 +370,107 @@ async def add_classification(
     )
 
 
-@router.post("/verify", status_code=status.HTTP_204_NO_CONTENT)
-async def verify_classification(
-    request: VerifyClassificationRequest,
-    current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
-) -> None:
-    """Verify a classification for an item"""
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
-
-    if request.item_ids_to_verify:
-        for item_id in request.item_ids_to_verify:
-            await user_items_collection.update_one(
+def _classification_flag_ops(
+    user_id: str,
+    taxonomy_id: str,
+    node_id: str,
+    flag: str,
+    groups: Iterable[Tuple[List[str], bool]],
+) -> Tuple[List[UpdateMany], List[UpdateOne]]:
+    """Build one items update and one node update per (item_ids, value) group.
+
+    arrayFilters pick the matching classification/node entry in every targeted
+    document, so the number of operations does not grow with the item count.
+    The filters only match documents that hold such an entry: MongoDB rejects
+    an $[elem] update on a missing array, which would fail the whole bulk write.
+    """
+    now = datetime.now()
+    item_ops = []
+    node_ops = []
+    for item_ids, value in groups:
+        if not item_ids:
+            continue
+        item_ops.append(
+            UpdateMany(
                 {
-                    "_id": ObjectId(item_id),
-                    f"classified_as.{request.taxonomy_id}.node_id": request.node_id,
+                    "user_id": user_id,
+                    "_id": {"$in": [ObjectId(item_id) for item_id in item_ids]},
+                    f"classified_as.{taxonomy_id}.node_id": node_id,
                 },
                 {
                     "$set": {
-                        f"classified_as.{request.taxonomy_id}.$.is_verified": True,
-                        f"classified_as.{request.taxonomy_id}.$.updated_at": datetime.now(),
+                        f"classified_as.{taxonomy_id}.$[elem].{flag}": value,
+                        f"classified_as.{taxonomy_id}.$[elem].updated_at": now,
                     }
                 },
+                array_filters=[{"elem.node_id": node_id}],
             )
-            await nodes_collection.update_one(
-                {
-                    "_id": ObjectId(request.node_id),
-                    "items.item_id": item_id,
-                },
-                {"$set": {"items.$.is_verified": True}},
+        )
+        node_ops.append(
+            UpdateOne(
+                {"_id": ObjectId(node_id), "items.item_id": {"$in": item_ids}},
+                {"$set": {f"items.$[item].{flag}": value}},
+                array_filters=[{"item.item_id": {"$in": item_ids}}],
             )
+        )
+    return item_ops, node_ops
 
-    if request.item_ids_to_unverify:
-        for item_id in request.item_ids_to_unverify:
-            await user_items_collection.update_one(
-                {
-                    "_id": ObjectId(item_id),
-                    f"classified_as.{request.taxonomy_id}.node_id": request.node_id,
-                },
-                {
-                    "$set": {
-                        f"classified_as.{request.taxonomy_id}.$.is_verified": False,
-                        f"classified_as.{request.taxonomy_id}.$.updated_at": datetime.now(),
-                    }
-                },
-            )
-            await nodes_collection.update_one(
-                {
-                    "_id": ObjectId(request.node_id),
-                    "items.item_id": item_id,
-                },
-                {"$set": {"items.$.is_verified": False}},
-            )
+
+@router.post("/verify", status_code=status.HTTP_204_NO_CONTENT)
+async def verify_classification(
+    request: VerifyClassificationRequest,
+    current_user: UserInDB = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db),
+) -> None:
+    """Verify a classification for an item"""
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+
+    item_ops, node_ops = _classification_flag_ops(
+        user_id,
+        request.taxonomy_id,
+        request.node_id,
+        "is_verified",
+        (
+            (request.item_ids_to_verify or [], True),
+            (request.item_ids_to_unverify or [], False),
+        ),
+    )
+
+    if item_ops:
+        await asyncio.gather(
+            user_items_collection.bulk_write(item_ops, ordered=False),
+            nodes_collection.bulk_write(node_ops, ordered=False),
+        )
 
 
 @router.post("/update-few-shot-examples", status_code=status.HTTP_204_NO_CONTENT)
 async def update_few_shot_examples(
     request: UpdateFewShotExamplesRequest,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Update the few shot examples for a node"""
-    item_ids_to_add = request.item_ids_to_add
-    item_ids_to_remove = request.item_ids_to_remove
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
 
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
+    item_ops, node_ops = _classification_flag_ops(
+        user_id,
+        request.taxonomy_id,
+        request.node_id,
+        "used_as_few_shot_example",
+        (
+            (request.item_ids_to_add, True),
+            (request.item_ids_to_remove, False),
+        ),
+    )
 
-    for item_id in item_ids_to_add:
-        await user_items_collection.update_one(
-            {
-                "_id": ObjectId(item_id),
-                f"classified_as.{request.taxonomy_id}.node_id": request.node_id,
-            },
-            {
-                "$set": {
-                    f"classified_as.{request.taxonomy_id}.$.used_as_few_shot_example": True,
-                    f"classified_as.{request.taxonomy_id}.$.updated_at": datetime.now(),
-                }
-            },
-        )
-        await nodes_collection.update_one(
-            {
-                "_id": ObjectId(request.node_id),
-                "items.item_id": item_id,
-            },
-            {"$set": {"items.$.used_as_few_shot_example": True}},
-        )
-    for item_id in item_ids_to_remove:
-        await user_items_collection.update_one(
-            {
-                "_id": ObjectId(item_id),
-                f"classified_as.{request.taxonomy_id}.node_id": request.node_id,
-            },
-            {
-                "$set": {
-                    f"classified_as.{request.taxonomy_id}.$.used_as_few_shot_example": False,
-                    f"classified_as.{request.taxonomy_id}.$.updated_at": datetime.now(),
-                }
-            },
-        )
-        await nodes_collection.update_one(
-            {
-                "_id": ObjectId(request.node_id),
-                "items.item_id": item_id,
-            },
-            {"$set": {"items.$.used_as_few_shot_example": False}},
+    if item_ops:
+        await asyncio.gather(
+            user_items_collection.bulk_write(item_ops, ordered=False),
+            nodes_collection.bulk_write(node_ops, ordered=False),
         )
 
 
@@ -377,10 +478,10 @@ async def update_few_shot_examples(
 async def get_classification_status(
     session_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Get the status of a classification or examination session"""
-    session_info = active_sessions.get(session_id)
+    session_info = await db.sessions.find_one({"_id": session_id})
 
     if not session_info:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -392,11 +493,28 @@ async def get_classification_status(
 
     # Get progress information
     if session_info["type"] == "classification":
-        user_items_collection = db[f"items_{str(current_user.id)}"]
-        total_count = await user_items_collection.count_documents({})
-        classified_count = await user_items_collection.count_documents(
-            {"classified_as": {"$exists": True, "$ne": []}}
-        )
+        user_items_collection = db.items
+        user_id = str(current_user.id)
+        # Items share one collection, so estimated_document_count() would count
+        # every user's items; count this user's items and keep only the field
+        # the classified count needs.
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$project": {"_id": 0, "classified_as": 1}},
+            {
+                "$facet": {
+                    "total": [{"$count": "n"}],
+                    "classified": [
+                        {"$match": {"classified_as": {"$exists": True, "$ne": []}}},
+                        {"$count": "n"},
+                    ],
+                }
+            },
+        ]
+        cursor = await user_items_collection.aggregate(pipeline)
+        [result] = await cursor.to_list(1)
+        total_count = result["total"][0]["n"] if result["total"] else 0
+        classified_count = result["classified"][0]["n"] if result["classified"] else 0
         unclassified_count = total_count - classified_count
 
         progress = {
@@ -406,7 +524,9 @@ async def get_classification_status(
         }
     else:
         # For examination, just return basic info
-        nodes_collection = db[f"nodes_{session_info['taxonomy_id']}"]
+        nodes_collection = get_taxonomy_nodes_collection(
+            db, session_info["taxonomy_id"]
+        )
         nodes_count = await nodes_collection.count_documents({})
         progress = {"total_nodes": nodes_count}
 
@@ -423,9 +543,12 @@ async def get_classification_status(
 async def cancel_session(
     session_id: str,
     current_user: UserInDB = Depends(get_current_user),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Cancel an active classification or examination session"""
-    session_info = active_sessions.get(session_id)
+    session_info = await db.sessions.find_one(
+        {"_id": session_id}, projection={"user_id": 1}
+    )
 
     if not session_info:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -435,8 +558,11 @@ async def cancel_session(
             status_code=403, detail="Not authorized to cancel this session"
         )
 
-    # Note: We can't actually stop the background task once it's started
-    # In production, I should use a task queue like Celery that supports cancellation
+    # The worker running the session picks this up on its next poll and cancels it
+    await db.sessions.update_one(
+        {"_id": session_id, "status": "running"},
+        {"$set": {"cancel_requested": True}},
+    )
 
 
 @router.put("/config/{taxonomy_id}", response_model=ClassifierState)
@@ -444,55 +570,69 @@ async def update_classifier_config(
     taxonomy_id: str,
     config_update: ClassifierStateUpdate,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Update classifier configuration for a taxonomy"""
     # Verify taxonomy exists and belongs to user
-    taxonomy_doc = await db.taxonomies.find_one(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
-    )
+    taxonomy_doc = await get_cached_taxonomy(db, taxonomy_id, str(current_user.id))
 
     if not taxonomy_doc:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
 
-    # Get current state or create default
-    current_state = taxonomy_doc.get("classifier_state")
-    if current_state:
-        state = ClassifierState(**current_state)
-    else:
-        state = ClassifierState()
-
-    # Update only provided fields
-    update_data = config_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        if value is not None:
-            setattr(state, field, value)
-
-    # Save updated state to database
-    await db.taxonomies.update_one(
-        {"_id": ObjectId(taxonomy_id)},
+    update_data = {
+        field: value
+        for field, value in config_update.model_dump(exclude_unset=True).items()
+        if value is not None
+    }
+    if not update_data:
+        taxonomy_doc = await db.taxonomies.find_one(
+            {"_id": ObjectId(taxonomy_id)}, projection={"classifier_state": 1}
+        )
+        return ClassifierState(**(taxonomy_doc.get("classifier_state") or {}))
+
+    # Only the changed fields are written, as dotted paths, and the result is read back
+    # from the database rather than from the cache. Other workers and the classifier
+    # service write classifier_state too, so rebuilding the whole object from a
+    # possibly stale cached copy would overwrite their changes.
+    taxonomy_doc = await db.taxonomies.find_one_and_update(
+        {"_id": ObjectId(taxonomy_id), "classifier_state": {"$type": "object"}},
         {
             "$set": {
-                "classifier_state": state.model_dump(),
-                "updated_at": datetime.utcnow(),
-            }
+                f"classifier_state.{field}": value
+                for field, value in update_data.items()
+            },
+            "$currentDate": {"updated_at": True},
         },
+        projection={"classifier_state": 1},
+        return_document=ReturnDocument.AFTER,
     )
+    if taxonomy_doc is None:
+        # No stored state yet, so there is nothing to overwrite
+        taxonomy_doc = await db.taxonomies.find_one_and_update(
+            {"_id": ObjectId(taxonomy_id)},
+            {
+                "$set": {
+                    "classifier_state": ClassifierState(**update_data).model_dump()
+                },
+                "$currentDate": {"updated_at": True},
+            },
+            projection={"classifier_state": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+    invalidate_cached_taxonomy(taxonomy_id)
 
-    return state
+    return ClassifierState(**taxonomy_doc["classifier_state"])
 
 
 @router.get("/config/{taxonomy_id}", response_model=ClassifierState)
 async def get_classifier_config(
     taxonomy_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Get classifier configuration for a taxonomy"""
     # Verify taxonomy exists and belongs to user
-    taxonomy_doc = await db.taxonomies.find_one(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
-    )
+    taxonomy_doc = await get_cached_taxonomy(db, taxonomy_id, str(current_user.id))
 
     if not taxonomy_doc:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
@@ -510,10 +650,10 @@ async def optimize_prompt_with_dspy(
     request: OptimizePromptWithDspyRequest,
     background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Optimize few shot examples for a node"""
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
     node = await nodes_collection.find_one({"_id": ObjectId(request.node_id)})
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
@@ -533,28 +673,28 @@ async def optimize_prompt_with_dspy(
             detail=f"Need at least 30 verified items and found {len(item_ids_to_optimize)}",
         )
 
-    user_items_collection = db[f"items_{str(current_user.id)}"]
-    items_to_optimize = await user_items_collection.find(
-        {"_id": {"$in": item_ids_to_optimize}}
-    ).to_list(length=None)
-    items_to_optimize = [ItemInDB(**item) for item in items_to_optimize]
-
-    trainset = []
-    for item in items_to_optimize:
-        trainset.append(
-            dspy.Example(review=item.content, category=node.label).with_inputs("review")
-        )
+    user_items_collection = db.items
+    user_id = str(current_user.id)
+    items_to_optimize, sibling_nodes = await asyncio.gather(
+        user_items_collection.find(
+            {"user_id": user_id, "_id": {"$in": item_ids_to_optimize}},
+            projection={"content": 1},
+        ).to_list(length=None),
+        nodes_collection.find(
+            {"parent_node_id": node.parent_node_id}, projection={"label": 1}
+        ).to_list(length=None),
+    )
 
-    sibling_nodes = await nodes_collection.find(
-        {"parent_node_id": node.parent_node_id}
-    ).to_list(length=None)
-    sibling_nodes = [NodeInDB(**sibling_node) for sibling_node in sibling_nodes]
-    categories_labels = [sibling_node.label for sibling_node in sibling_nodes] + [
+    trainset = [
+        dspy.Example(review=item["content"], category=node.label).with_inputs("review")
+        for item in items_to_optimize
+    ]
+    categories_labels = [sibling_node["label"] for sibling_node in sibling_nodes] + [
         node.label
     ]
 
-    dspy_optimizer = DspyOptimizer(
-        lm=dspy.LM("openai/gpt-4o-mini"),
+    background_tasks.add_task(
+        run_dspy_optimizer,
         connection_manager=connection_manager,
         user_id=str(current_user.id),
         node_id=request.node_id,
@@ -562,16 +702,16 @@ async def optimize_prompt_with_dspy(
         trainset=trainset,
     )
 
-    background_tasks.add_task(dspy_optimizer.compile)
-
 
 @router.post("/init-trial-setup", status_code=status.HTTP_204_NO_CONTENT)
 async def init_trial_setup(
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Initialize a trial setup for a user"""
-    collections = await db.list_collection_names()
+    collections = await db.list_collection_names(
+        filter={"name": {"$in": ["sample_items", "sample_nodes"]}}
+    )
     if "sample_items" not in collections or "sample_nodes" not in collections:
         raise HTTPException(
             status_code=404, detail="sample_items collection not found in DB"
@@ -582,18 +722,36 @@ async def init_trial_setup(
         name="Defect classification",
         aspect="I’m selling refurbished iPhones online, and customers have reported various defects. I want to categorize these issues in a clear, organized way so I can identify the most common problems, address them first, and understand which defects are rare.",
     )
-    await db.taxonomies.insert_one(
-        sample_taxonomy.model_dump(by_alias=True, context={"keep_objectid": True})
+    sample_items, sample_nodes, *_ = await asyncio.gather(
+        db.sample_items.find({}).to_list(None),
+        db.sample_nodes.find({}).to_list(None),
+        db.taxonomies.insert_one(
+            sample_taxonomy.model_dump(by_alias=True, context={"keep_objectid": True})
+        ),
+        create_taxonomy_nodes_indexes(
+            get_taxonomy_nodes_collection(db, str(sample_taxonomy.id))
+        ),
     )
 
-    pipeline = [
-        {"$match": {}},
-        {"$out": f"items_{str(current_user.id)}"},
-    ]
-    await db.sample_items.aggregate(pipeline).to_list(None)
-
-    pipeline = [
-        {"$match": {}},
-        {"$out": f"nodes_{str(sample_taxonomy.id)}"},
-    ]
-    await db.sample_nodes.aggregate(pipeline).to_list(None)
+    # Items live in a collection shared by all users, so the sample items need
+    # fresh ids and the sample nodes must point at those ids.
+    new_item_ids = {}
+    for item in sample_items:
+        new_id = ObjectId()
+        new_item_ids[str(item["_id"])] = str(new_id)
+        item["_id"] = new_id
+        item["user_id"] = str(current_user.id)
+    for node in sample_nodes:
+        for item in node.get("items") or []:
+            item["item_id"] = new_item_ids.get(item["item_id"], item["item_id"])
+
+    inserts = []
+    if sample_items:
+        inserts.append(db.items.insert_many(sample_items, ordered=False))
+    if sample_nodes:
+        inserts.append(
+            get_taxonomy_nodes_collection(db, str(sample_taxonomy.id)).insert_many(
+                sample_nodes, ordered=False
+            )
+        )
+    await asyncio.gather(*inserts)
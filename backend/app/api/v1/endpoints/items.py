@@ -1,12 +1,15 @@
 import random
+import asyncio
 import string
 import logging
+from datetime import datetime
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from bson import ObjectId
 from pydantic import ValidationError
 
-from app.api.deps import get_current_user, get_user_items_collection
+from app.api.deps import get_current_user, get_current_user_id, get_items_collection
 from app.models.user import UserInDB
 from app.models.item import ItemInDB
 from app.schemas.item import (
@@ -16,8 +19,8 @@ from app.schemas.item import (
     ItemUploadRequest,
     GetIdsByListOfContentRequest,
 )
-from app.db.database import get_db
-from motor.motor_asyncio import AsyncIOMotorCollection
+from app.db.database import get_db, ITEMS_BY_USER_INDEX
+from pymongo.asynchronous.collection import AsyncCollection
 from agents.state import ItemState, NodeAndConfidence
 from app.db.serializers import MongoSerializer
 
@@ -25,6 +28,31 @@ from app.db.serializers import MongoSerializer
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Large content lists are looked up in concurrent chunks of this size
+CONTENT_LOOKUP_CHUNK_SIZE = 1000
+
+# list_items returns its page inside a single $facet result document, which MongoDB
+# caps at 16MB, so the page size is bounded
+LIST_ITEMS_MAX_LIMIT = 1000
+
+
+def items_json_response(
+    payload: dict, status_code: int = status.HTTP_200_OK
+) -> Response:
+    """Encode an ItemsInResponse payload of constructed ItemResponse models.
+
+    The items come from trusted documents, so the envelope is constructed
+    without validation. Returning a Response directly also skips FastAPI's own
+    response_model validation, which would otherwise run over every item again.
+    """
+    return Response(
+        content=ItemsInResponse.model_construct(**payload).model_dump_json(
+            by_alias=True
+        ),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
 
 @router.post(
     "/upload",
@@ -33,7 +61,8 @@ logger = logging.getLogger(__name__)
 )
 async def upload_items(
     request: ItemUploadRequest,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """
     Upload multiple items for classification
@@ -44,24 +73,33 @@ async def upload_items(
             detail="No item data providedto upload",
         )
 
+    # Same document shape as ItemInDB, built directly to skip per-item validation
+    now = datetime.utcnow()
     items_to_insert = [
-        ItemInDB(content=item_data.content) for item_data in request.items
+        {
+            "_id": ObjectId(),
+            "content": item_data.content,
+            "classified_as": {},
+            "created_at": now,
+            "updated_at": now,
+            "user_id": user_id,
+        }
+        for item_data in request.items
     ]
 
-    result = await user_items_collection.insert_many(
-        [
-            item.model_dump(by_alias=True, context={"keep_objectid": True})
-            for item in items_to_insert
-        ]
-    )
+    result = await items_collection.insert_many(items_to_insert, ordered=False)
     logger.info(f"Successfully uploaded {len(result.inserted_ids)} items")
 
-    return ItemsInResponse(
-        items=[
-            MongoSerializer.serialize_item_to_response(item) for item in items_to_insert
-        ],
-        count=len(result.inserted_ids),
-        unclassified_count=len(result.inserted_ids),
+    return items_json_response(
+        {
+            "items": [
+                MongoSerializer.serialize_item_doc_to_response(item)
+                for item in items_to_insert
+            ],
+            "count": len(result.inserted_ids),
+            "unclassified_count": len(result.inserted_ids),
+        },
+        status_code=status.HTTP_201_CREATED,
     )
 
 
@@ -69,18 +107,28 @@ async def upload_items(
 async def get_item(
     taxonomy_id: str,
     item_id: str,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """Get item by ID"""
-    item = await user_items_collection.find_one({"id": item_id})
+    # An invalid ObjectId cannot match any item
+    if not ObjectId.is_valid(item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    item = await items_collection.find_one(
+        {"user_id": user_id, "_id": ObjectId(item_id)},
+        projection=MongoSerializer.item_response_projection(taxonomy_id),
+    )
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    item = ItemInDB(**item)
-
-    return ItemInResponse(
-        item=MongoSerializer.serialize_item_to_response(item, taxonomy_id)
+    item_response = ItemInResponse.model_construct(
+        item=MongoSerializer.serialize_item_doc_to_response(item, taxonomy_id)
+    )
+    return Response(
+        content=item_response.model_dump_json(by_alias=True),
+        media_type="application/json",
     )
 
 
@@ -88,7 +136,8 @@ async def get_item(
 async def get_items_by_ids(
     taxonomy_id: str,
     item_ids: str,  # Changed from List[str] to str
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """Get multiple items by their IDs"""
 
@@ -101,8 +150,13 @@ async def get_items_by_ids(
             detail="No valid item IDs provided",
         )
 
-    query = {"_id": {"$in": [ObjectId(item_id) for item_id in item_ids_list]}}
-    cursor = user_items_collection.find(query).sort("updated_at", -1)
+    query = {
+        "user_id": user_id,
+        "_id": {"$in": [ObjectId(item_id) for item_id in item_ids_list]},
+    }
+    cursor = items_collection.find(
+        query, projection=MongoSerializer.item_response_projection(taxonomy_id)
+    ).sort("updated_at", -1)
     items = await cursor.to_list(length=None)
 
     if not items:
@@ -111,24 +165,27 @@ async def get_items_by_ids(
             detail="No items found",
         )
 
-    items = [ItemInDB(**item) for item in items]
     items_response = [
-        MongoSerializer.serialize_item_to_response(item, taxonomy_id) for item in items
+        MongoSerializer.serialize_item_doc_to_response(item, taxonomy_id)
+        for item in items
     ]
 
-    return ItemsInResponse(
-        items=items_response,
-        count=len(items_response),
-        unclassified_count=len(items_response),
+    return items_json_response(
+        {
+            "items": items_response,
+            "count": len(items_response),
+            "unclassified_count": len(items_response),
+        }
     )
 
 
 @router.get("/list", response_model=ItemsInResponse)
 async def list_items(
     taxonomy_id: str,
-    skip: int = 0,
-    limit: int = 100,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=LIST_ITEMS_MAX_LIMIT),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """List user's items"""
     if not taxonomy_id:
@@ -136,23 +193,38 @@ async def list_items(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Taxonomy ID is required",
         )
-    print(f"taxonomy_id: {taxonomy_id}")
-    total_count = await user_items_collection.count_documents({})
-    unclassified_count = await user_items_collection.count_documents(
-        {f"classified_as.{taxonomy_id}": {"$exists": False}}
-    )
-
-    cursor = user_items_collection.find({}).skip(skip).limit(limit)
-    items = await cursor.to_list(length=limit)
-    items = [ItemInDB(**item) for item in items]
-
-    return ItemsInResponse(
-        items=[
-            MongoSerializer.serialize_item_to_response(item, taxonomy_id)
-            for item in items
-        ],
-        count=total_count,
-        unclassified_count=unclassified_count,
+    # Counts and the requested page in a single round trip
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {
+            "$facet": {
+                "total": [{"$count": "n"}],
+                "unclassified": [
+                    {"$match": {f"classified_as.{taxonomy_id}": {"$exists": False}}},
+                    {"$count": "n"},
+                ],
+                "page": [
+                    {"$skip": skip},
+                    {"$limit": limit},
+                    {"$project": MongoSerializer.item_response_projection(taxonomy_id)},
+                ],
+            }
+        },
+    ]
+    cursor = await items_collection.aggregate(pipeline)
+    [result] = await cursor.to_list(1)
+    total_count = result["total"][0]["n"] if result["total"] else 0
+    unclassified_count = result["unclassified"][0]["n"] if result["unclassified"] else 0
+
+    return items_json_response(
+        {
+            "items": [
+                MongoSerializer.serialize_item_doc_to_response(item, taxonomy_id)
+                for item in result["page"]
+            ],
+            "count": total_count,
+            "unclassified_count": unclassified_count,
+        }
     )
 
 
@@ -160,7 +232,8 @@ async def list_items(
 async def get_unclassified_batch(
     taxonomy_id: str,
     batch_size: int,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """Get a batch of unclassified items"""
     if batch_size <= 0 or batch_size > 100:
@@ -170,30 +243,45 @@ async def get_unclassified_batch(
 
     # Get unclassified items for this taxonomy
     query = {
+        "user_id": user_id,
         f"classified_as.{taxonomy_id}": {"$exists": False},
     }
 
-    cursor = user_items_collection.find(query).limit(batch_size)
+    cursor = (
+        items_collection.find(
+            query, projection=MongoSerializer.item_response_projection(taxonomy_id)
+        )
+        .hint(ITEMS_BY_USER_INDEX)
+        .limit(batch_size)
+    )
     items = await cursor.to_list(length=batch_size)
-    items = [ItemInDB(**item) for item in items]
-
-    return ItemsInResponse(
-        items=[
-            MongoSerializer.serialize_item_to_response(item, taxonomy_id)
-            for item in items
-        ],
-        count=len(items),
-        unclassified_count=0,
+
+    return items_json_response(
+        {
+            "items": [
+                MongoSerializer.serialize_item_doc_to_response(item, taxonomy_id)
+                for item in items
+            ],
+            "count": len(items),
+            "unclassified_count": 0,
+        }
     )
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(
     item_id: str,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> None:
     """Delete an item"""
-    result = await user_items_collection.delete_one({"id": ObjectId(item_id)})
+    # An invalid ObjectId cannot match any item
+    if not ObjectId.is_valid(item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    result = await items_collection.delete_one(
+        {"user_id": user_id, "_id": ObjectId(item_id)}
+    )
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -201,32 +289,51 @@ async def delete_item(
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_items(
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> None:
     """Delete all items for the current user"""
-    await user_items_collection.delete_many({})
+    await items_collection.delete_many({"user_id": user_id})
 
 
 @router.post("/get-ids-by-list-of-content", response_model=list[str])
 async def get_ids_by_list_of_content(
     request: GetIdsByListOfContentRequest,
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
     """Get item IDs by list of content"""
 
-    items = await user_items_collection.find(
-        {"content": {"$in": request.content_list}}
-    ).to_list(length=None)
+    async def find_ids(contents: List[str]) -> List[str]:
+        cursor = items_collection.find(
+            {"user_id": user_id, "content": {"$in": contents}}, projection={"_id": 1}
+        )
+        return [str(item["_id"]) async for item in cursor]
 
-    items = [ItemInDB(**item) for item in items]
-    item_ids = [str(item.id) for item in items]
-    return item_ids
+    content_list = request.content_list
+    chunks = await asyncio.gather(
+        *(
+            find_ids(content_list[start : start + CONTENT_LOOKUP_CHUNK_SIZE])
+            for start in range(0, len(content_list), CONTENT_LOOKUP_CHUNK_SIZE)
+        )
+    )
+    return [item_id for chunk in chunks for item_id in chunk]
 
 
-@router.get("/export-all", response_model=list[ItemInDB])
+@router.get("/export-all", response_class=StreamingResponse)
 async def export_all_items(
-    user_items_collection: AsyncIOMotorCollection = Depends(get_user_items_collection),
+    user_id: str = Depends(get_current_user_id),
+    items_collection: AsyncCollection = Depends(get_items_collection),
 ) -> Any:
-    """Export all items for the current user"""
-    items = await user_items_collection.find({}).to_list(length=None)
-    return [ItemInDB(**item) for item in items]
+    """Export all items for the current user as newline-delimited JSON"""
+
+    async def generate_lines():
+        # user_id is not part of ItemInDB, so it is not decoded at all
+        cursor = items_collection.find(
+            {"user_id": user_id}, projection={"user_id": 0}
+        ).batch_size(1000)
+        async for item in cursor:
+            # model_validate reads the document as is, without a **kwargs copy
+            yield ItemInDB.model_validate(item).model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
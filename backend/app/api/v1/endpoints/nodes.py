@@ -1,11 +1,12 @@
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from bson import ObjectId
+from fastapi.responses import Response, StreamingResponse
 import uuid
-from datetime import datetime
+import asyncio
 import logging
+import orjson
 
-from app.api.deps import get_current_user
+from app.api.deps import as_oid, get_current_user
 from app.models.user import UserInDB
 from app.models.node import NodeInDB
 from app.models.taxonomy import TaxonomyInDB
@@ -19,11 +20,17 @@ from app.schemas.node import (
     ParentUpdate,
     NodeUpdateResultResponse,
 )
-from app.db.database import get_db, get_user_items_collection
+from app.db.database import (
+    get_db,
+    get_cached_taxonomy,
+    get_items_collection,
+    get_taxonomy_nodes_collection,
+)
 from app.services.classifier_service import ClassifierService
 from app.websocket.manager import connection_manager
-from motor.core import AgnosticDatabase
-from agents.state import ItemState, ClassNodeState, Taxonomy, NodeAndConfidence
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo.asynchronous.database import AsyncDatabase
+from agents.state import ItemState, ClassNodeState, NodeAndConfidence
 from app.db.serializers import MongoSerializer
 from app.models.item import ItemInDB
 
@@ -32,19 +39,40 @@ router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+# Nodes are streamed to the client in cursor batches of this size
+NODES_CURSOR_BATCH_SIZE = 200
+
+
+def node_json_response(node: NodeResponse) -> Response:
+    """Encode a constructed NodeResponse, skipping FastAPI's response_model validation."""
+    return Response(
+        content=node.model_dump_json(by_alias=True), media_type="application/json"
+    )
+
 
 @router.post("/initial", response_model=InitialNodesResponse)
 async def create_initial_nodes(
     request: InitialNodesRequest,
     background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
-    print(request)
     """Create initial nodes for a taxonomy using selected items"""
-    # Verify taxonomy exists and belongs to user
-    taxonomy = await db.taxonomies.find_one(
-        {"_id": ObjectId(request.taxonomy_id), "user_id": str(current_user.id)}
+    user_id = str(current_user.id)
+    nodes_collection = get_taxonomy_nodes_collection(db, request.taxonomy_id)
+    items_collection = get_items_collection()
+
+    # Verify the taxonomy, check for existing nodes and read the items (any items
+    # up to the requested amount) concurrently; the results are discarded on error
+    taxonomy, existing_node, items = await asyncio.gather(
+        get_cached_taxonomy(db, request.taxonomy_id, user_id),
+        nodes_collection.find_one({}, projection={"_id": 1}),
+        items_collection.find(
+            {"user_id": user_id},
+            projection=MongoSerializer.item_taxonomy_projection(request.taxonomy_id),
+        )
+        .limit(request.num_of_items_to_use)
+        .to_list(),
     )
 
     if not taxonomy:
@@ -52,22 +80,11 @@ async def create_initial_nodes(
 
     taxonomy = TaxonomyInDB(**taxonomy)
 
-    # Check if nodes already exist for this taxonomy
-    nodes_collection = db[f"nodes_{request.taxonomy_id}"]
-    existing_nodes = await nodes_collection.count_documents({})
-
-    if existing_nodes > 0:
+    if existing_node is not None:
         raise HTTPException(
             status_code=400, detail="Nodes already exist for this taxonomy"
         )
 
-    # Get the requested number of items (preferably unclassified ones)
-    user_items_collection = get_user_items_collection(str(current_user.id))
-
-    # Get any items up to the requested amount
-    items_cursor = user_items_collection.find({}).limit(request.num_of_items_to_use)
-    items = await items_cursor.to_list()
-
     if not items:
         raise HTTPException(status_code=400, detail="No items found to create nodes")
 
@@ -90,9 +107,7 @@ async def create_initial_nodes(
     background_tasks.add_task(
         classifier_service.create_initial_nodes,
         taxonomy_id=request.taxonomy_id,
-        taxonomy=Taxonomy(
-            **taxonomy.model_dump(by_alias=False, context={"keep_objectid": False})
-        ),
+        taxonomy=MongoSerializer.serialize_taxonomy_to_state(taxonomy),
         items=items,
         llm_name=request.llm_name,
         user_id=str(current_user.id),
@@ -104,42 +119,60 @@ async def create_initial_nodes(
     )
 
 
+async def _verify_and_fetch_nodes(
+    db: AsyncDatabase, taxonomy_id: str, user_id: str
+) -> Tuple[Optional[dict], AsyncCursor, Optional[dict]]:
+    """Run the taxonomy ownership check while the first batch of nodes is fetched.
+
+    Returns the taxonomy (None when not found), the node cursor and the first
+    node document (None when the taxonomy has no nodes).
+    """
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
+    cursor = nodes_collection.find(
+        {}, projection=dict.fromkeys(MongoSerializer.NODE_RESPONSE_FIELDS, 1)
+    ).batch_size(NODES_CURSOR_BATCH_SIZE)
+    taxonomy, first_node = await asyncio.gather(
+        db.taxonomies.find_one(
+            {"_id": as_oid(taxonomy_id), "user_id": user_id},
+            projection={"_id": 1},
+        ),
+        anext(cursor, None),
+    )
+    return taxonomy, cursor, first_node
+
+
 @router.get("/{taxonomy_id}", response_model=NodesInResponse)
 async def list_nodes(
     taxonomy_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """List all nodes for a taxonomy"""
-    # Verify taxonomy exists and belongs to user
-    taxonomy = await db.taxonomies.find_one(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
+    taxonomy, cursor, first_node = await _verify_and_fetch_nodes(
+        db, taxonomy_id, str(current_user.id)
     )
 
     if not taxonomy:
+        await cursor.close()
         raise HTTPException(status_code=404, detail="Taxonomy not found")
 
-    # Get all nodes for taxonomy
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
-    cursor = nodes_collection.find({})
-    nodes = await cursor.to_list(length=None)
-
-    # Convert to response format
-    node_responses = []
-    for node in nodes:
-        node_responses.append(
-            NodeResponse(
-                id=str(node["_id"]),
-                parent_node_id=node["parent_node_id"],
-                label=node["label"],
-                description=node["description"],
-                items=node.get("items", []),
-                created_at=node["created_at"],
-                updated_at=node["updated_at"],
+    # Stored nodes are already validated; stream the documents as they arrive
+    async def generate_body():
+        count = 0
+        yield b'{"nodes":['
+        if first_node is not None:
+            yield orjson.dumps(
+                MongoSerializer.serialize_node_doc_to_response(first_node)
             )
-        )
+            count += 1
+            async for node in cursor:
+                yield b"," + orjson.dumps(
+                    MongoSerializer.serialize_node_doc_to_response(node)
+                )
+                count += 1
+        yield b'],"count":%d}' % count
 
-    return NodesInResponse(nodes=node_responses, count=len(node_responses))
+    return StreamingResponse(generate_body(), media_type="application/json")
 
 
 @router.get("/{taxonomy_id}/{node_id}", response_model=NodeResponse)
@@ -147,11 +180,11 @@ async def get_node(
     taxonomy_id: str,
     node_id: str,  # This is the 4-character node ID, not MongoDB _id
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Get a specific node by its node_id"""
     # Find node by taxonomy_id and node_id
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
     node = await nodes_collection.find_one(
         {
             "_id": node_id,
@@ -161,15 +194,7 @@ async def get_node(
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    return NodeResponse(
-        id=str(node["_id"]),
-        parent_node_id=node["parent_node_id"],
-        label=node["label"],
-        description=node["description"],
-        items=node.get("items", []),
-        created_at=node["created_at"],
-        updated_at=node["updated_at"],
-    )
+    return node_json_response(MongoSerializer.serialize_node_doc_to_model(node))
 
 
 @router.patch("/{taxonomy_id}/{node_id}")
@@ -177,7 +202,7 @@ async def update_node(
     taxonomy_id: str,
     node_id: str,
     update_data: NodeUpdate,
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Update a node's label and description"""
 
@@ -185,13 +210,13 @@ async def update_node(
         raise HTTPException(status_code=400, detail="No update data provided")
 
     # Update the node
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
     update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
 
-    update_dict["updated_at"] = datetime.utcnow()
+    # The server stamps updated_at itself
     result = await nodes_collection.update_one(
-        {"_id": ObjectId(node_id)},
-        {"$set": update_dict},
+        {"_id": as_oid(node_id)},
+        {"$set": update_dict, "$currentDate": {"updated_at": True}},
     )
 
     if result.matched_count == 0:
@@ -203,27 +228,25 @@ async def create_node(
     taxonomy_id: str,
     node_data: NodeCreate,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Create a new node"""
     # Verify taxonomy exists and belongs to user
     taxonomy = await db.taxonomies.find_one(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
+        {"_id": as_oid(taxonomy_id), "user_id": str(current_user.id)},
+        projection={"_id": 1},
     )
     if not taxonomy:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
 
     # Create the node
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
 
     node = MongoSerializer.deserialize_node_from_request(node_data)
 
     await nodes_collection.insert_one(node)
 
-    node["id"] = str(node["_id"])
-    del node["_id"]
-
-    return NodeResponse(**node)
+    return node_json_response(MongoSerializer.serialize_node_doc_to_model(node))
 
 
 @router.delete("/{taxonomy_id}/{node_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -231,38 +254,47 @@ async def delete_node(
     taxonomy_id: str,
     node_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Delete a specific node from a taxonomy"""
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
 
     # Check if node has children
-    children = await nodes_collection.find_one({"parent_node_id": node_id})
+    children = await nodes_collection.find_one(
+        {"parent_node_id": node_id}, projection={"_id": 1}
+    )
     if children:
         raise HTTPException(
             status_code=400,
             detail="Cannot delete node with children. Delete or reassign children first.",
         )
 
-    # Delete the node
-    result = await nodes_collection.delete_one({"_id": ObjectId(node_id)})
+    # Delete the node and remove it from the classifications of the items that
+    # reference it in the same round trip. If the node does not exist, the item
+    # update only clears stale references. The filter is served by the
+    # classified_as wildcard index.
+    items_collection = get_items_collection()
+    result, _ = await asyncio.gather(
+        nodes_collection.delete_one({"_id": as_oid(node_id)}),
+        items_collection.update_many(
+            {
+                "user_id": str(current_user.id),
+                f"classified_as.{taxonomy_id}.node_id": node_id,
+            },
+            {"$pull": {f"classified_as.{taxonomy_id}": {"node_id": node_id}}},
+        ),
+    )
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Node not found")
 
-    # Remove this node from any item classifications
-    items_collection = get_user_items_collection(str(current_user.id))
-    await items_collection.update_many(
-        {}, {"$pull": {"nodes_and_confidences": {"node_id": node_id}}}
-    )
-
 
 @router.delete("/{taxonomy_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_all_nodes(
     taxonomy_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> None:
     """Delete all nodes for a taxonomy"""
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
     await nodes_collection.delete_many({})
@@ -1,8 +1,9 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import Response
 from bson import ObjectId
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_taxonomy_oid
 from app.models.user import UserInDB
 from app.models.taxonomy import TaxonomyInDB
 from app.schemas.taxonomy import (
@@ -11,9 +12,14 @@ from app.schemas.taxonomy import (
     TaxonomyInResponse,
     TaxonomiesInResponse,
 )
-from app.db.database import get_db
+from app.db.database import (
+    get_db,
+    create_taxonomy_nodes_indexes,
+    get_taxonomy_nodes_collection,
+    invalidate_cached_taxonomy,
+)
 from app.db.serializers import MongoSerializer
-from motor.core import AgnosticDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 
 
 router = APIRouter()
@@ -23,12 +29,13 @@ router = APIRouter()
 async def create_taxonomy(
     taxonomy_in: TaxonomyCreate,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Create new taxonomy"""
     # Check if taxonomy with same name already exists for user
     existing = await db.taxonomies.find_one(
-        {"user_id": str(current_user.id), "name": taxonomy_in.name}
+        {"user_id": str(current_user.id), "name": taxonomy_in.name},
+        projection={"_id": 1},
     )
     if existing:
         raise HTTPException(
@@ -44,6 +51,9 @@ async def create_taxonomy(
     await db.taxonomies.insert_one(
         taxonomy_db.model_dump(by_alias=True, context={"keep_objectid": True})
     )
+    await create_taxonomy_nodes_indexes(
+        get_taxonomy_nodes_collection(db, str(taxonomy_db.id))
+    )
 
     taxonomy_response = MongoSerializer.serialize_taxonomy_to_response(taxonomy_db)
 
@@ -55,7 +65,7 @@ async def list_taxonomies(
     skip: int = 0,
     limit: int = 10,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """List user's taxonomies"""
     cursor = (
@@ -65,13 +75,21 @@ async def list_taxonomies(
         MongoSerializer.serialize_taxonomy_to_response(TaxonomyInDB(**taxonomy))
         for taxonomy in await cursor.to_list(length=limit)
     ]
-    total_taxonomy_count = await db.taxonomies.count_documents(
-        {"user_id": str(current_user.id)}
-    )
+    # A short page already tells us the total, saving the count round trip
+    if len(taxonomies) < limit and (taxonomies or skip == 0):
+        total_taxonomy_count = skip + len(taxonomies)
+    else:
+        total_taxonomy_count = await db.taxonomies.count_documents(
+            {"user_id": str(current_user.id)}
+        )
 
-    return TaxonomiesInResponse(
-        taxonomies=taxonomies,
-        count=total_taxonomy_count,
+    # Encoded in one pydantic-core pass so FastAPI does not validate the list a
+    # second time
+    taxonomies_response = TaxonomiesInResponse.model_construct(
+        taxonomies=taxonomies, count=total_taxonomy_count
+    )
+    return Response(
+        content=taxonomies_response.model_dump_json(), media_type="application/json"
     )
 
 
@@ -79,14 +97,12 @@ async def list_taxonomies(
 async def get_taxonomy(
     taxonomy_id: str,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
+    taxonomy_oid: ObjectId = Depends(get_taxonomy_oid),
 ) -> Any:
     """Get taxonomy by ID"""
-    if not ObjectId.is_valid(taxonomy_id):
-        raise HTTPException(status_code=400, detail="Invalid taxonomy ID")
-
     taxonomy = await db.taxonomies.find_one(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
+        {"_id": taxonomy_oid, "user_id": str(current_user.id)}
     )
 
     if not taxonomy:
@@ -102,12 +118,10 @@ async def update_taxonomy(
     taxonomy_id: str,
     taxonomy_update: TaxonomyUpdate,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
+    taxonomy_oid: ObjectId = Depends(get_taxonomy_oid),
 ) -> Any:
     """Update taxonomy"""
-    if not ObjectId.is_valid(taxonomy_id):
-        raise HTTPException(status_code=400, detail="Invalid taxonomy ID")
-
     update_data = taxonomy_update.model_dump(exclude_unset=True)
 
     if not update_data:
@@ -121,8 +135,9 @@ async def update_taxonomy(
             {
                 "user_id": str(current_user.id),
                 "name": update_data["name"],
-                "_id": {"$ne": ObjectId(taxonomy_id)},
-            }
+                "_id": {"$ne": taxonomy_oid},
+            },
+            projection={"_id": 1},
         )
         if existing:
             raise HTTPException(
@@ -131,10 +146,11 @@ async def update_taxonomy(
             )
 
     updated_taxonomy = await db.taxonomies.find_one_and_update(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)},
+        {"_id": taxonomy_oid, "user_id": str(current_user.id)},
         {"$set": update_data},
         return_document=True,
     )
+    invalidate_cached_taxonomy(taxonomy_id)
 
     updated_taxonomy_response = MongoSerializer.serialize_taxonomy_to_response(
         TaxonomyInDB(**updated_taxonomy)
@@ -146,24 +162,25 @@ async def update_taxonomy(
 @router.delete("/{taxonomy_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_taxonomy(
     taxonomy_id: str,
+    background_tasks: BackgroundTasks,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
+    taxonomy_oid: ObjectId = Depends(get_taxonomy_oid),
 ) -> None:
     """Delete taxonomy and all associated data"""
-    if not ObjectId.is_valid(taxonomy_id):
-        raise HTTPException(status_code=400, detail="Invalid taxonomy ID")
-
     # Find and delete taxonomy in one operation
     deleted_taxonomy = await db.taxonomies.find_one_and_delete(
-        {"_id": ObjectId(taxonomy_id), "user_id": str(current_user.id)}
+        {"_id": taxonomy_oid, "user_id": str(current_user.id)},
+        projection={"_id": 1},
     )
 
     if not deleted_taxonomy:
         raise HTTPException(status_code=404, detail="Taxonomy not found")
+    invalidate_cached_taxonomy(taxonomy_id)
 
-    # Drop the nodes collection for this taxonomy
-    nodes_collection = db[f"nodes_{taxonomy_id}"]
-    await nodes_collection.drop()
+    # Drop the nodes collection for this taxonomy once the response is sent
+    nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
+    background_tasks.add_task(nodes_collection.drop)
 
     # Note: Items are stored per user, not per taxonomy, so we don't delete them
 
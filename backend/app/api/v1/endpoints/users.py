@@ -3,9 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.api.deps import get_current_user
 from app.models.user import UserInDB
-from app.schemas.user import UserResponse, UserInResponse, UserUpdate
+from app.schemas.user import UserInResponse, UserUpdate
 from app.db.database import get_db
-from motor.core import AgnosticDatabase
+from app.db.serializers import MongoSerializer
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo import ReturnDocument
 
 
@@ -17,9 +18,7 @@ async def read_user_me(
     current_user: UserInDB = Depends(get_current_user),
 ) -> Any:
     """Get current user info"""
-    user_response = UserResponse(
-        **current_user.model_dump(by_alias=False, context={"keep_objectid": False})
-    )
+    user_response = MongoSerializer.serialize_user_to_response(current_user)
     return UserInResponse(user=user_response)
 
 
@@ -27,7 +26,7 @@ async def read_user_me(
 async def update_user_me(
     user_update: UserUpdate,
     current_user: UserInDB = Depends(get_current_user),
-    db: AgnosticDatabase = Depends(get_db),
+    db: AsyncDatabase = Depends(get_db),
 ) -> Any:
     """Update current user info"""
     update_data = user_update.model_dump(exclude_unset=True)
@@ -46,7 +45,5 @@ async def update_user_me(
         raise HTTPException(status_code=404, detail="User not found")
 
     updated_user = UserInDB(**updated_user_doc)
-    user_response = UserResponse(
-        **updated_user.model_dump(by_alias=False, context={"keep_objectid": False})
-    )
+    user_response = MongoSerializer.serialize_user_to_response(updated_user)
     return UserInResponse(user=user_response)
@@ -1,10 +1,10 @@
 from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from jose import JWTError
 
 from app.core.security import verify_token
 from app.websocket.manager import connection_manager
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +19,13 @@ async def get_current_user_ws(
         await websocket.close(code=1008, reason="Missing authentication token")
         return None
 
-    try:
-        user_id = verify_token(token, token_type="access")
-        if not user_id:
-            await websocket.close(code=1008, reason="Invalid token")
-            return None
-        return user_id
-    except JWTError:
+    # verify_token caches successful verifications, so reconnects with the same
+    # token skip the JWT decode; it returns None instead of raising JWTError
+    user_id = verify_token(token, token_type="access")
+    if not user_id:
         await websocket.close(code=1008, reason="Invalid token")
         return None
+    return user_id
 
 
 @router.websocket("/connect")
@@ -66,9 +64,9 @@ async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = Query(
     try:
         while True:
             # Wait for messages from client
-            logger.debug(f"Waiting for message from user {user_id}")
-            data = await websocket.receive_json()
-            logger.debug(f"Received message from user {user_id}: {data}")
+            logger.debug("Waiting for message from user %s", user_id)
+            data = orjson.loads(await websocket.receive_text())
+            logger.debug("Received message from user %s: %s", user_id, data)
 
             # Handle different message types
             message_type = data.get("type")
@@ -81,7 +79,7 @@ async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = Query(
 
             elif message_type == "pong":
                 # Acknowledge pong response from client
-                logger.debug(f"Received pong from user {user_id}")
+                logger.debug("Received pong from user %s", user_id)
 
             else:
                 # Unknown message type
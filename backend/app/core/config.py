@@ -30,6 +30,10 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "taxonomy_agent"
+    # Wire compression offered to the server, e.g. "zstd,zlib" when the zstandard
+    # package is installed. Empty disables compression.
+    MONGODB_COMPRESSORS: str = "zlib"
+    MONGODB_MAX_POOL_SIZE: int = 100
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -63,6 +67,8 @@ class Settings(BaseSettings):
     # LLM API Keys
     ANTHROPIC_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
+    # Connection pool size of the HTTP client shared by the OpenAI clients
+    LLM_MAX_CONCURRENCY: int = 32
 
     # LangGraph Configuration
     LANGGRAPH_STUDIO: bool = False
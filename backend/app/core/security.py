@@ -1,4 +1,7 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from threading import Lock
 from typing import Any, Union, Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -8,6 +11,13 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Successfully verified tokens are cached for a short time so that repeated requests with the
+# same token skip the JWT decode. Entries never outlive the token's own expiry.
+VERIFIED_TOKEN_CACHE_TTL_SECONDS = 60
+VERIFIED_TOKEN_CACHE_MAX_SIZE = 10_000
+_verified_token_cache: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+_verified_token_cache_lock = Lock()
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -47,6 +57,17 @@ def create_refresh_token(
 
 def verify_token(token: str, token_type: str = "access") -> Optional[str]:
     """Verify and decode JWT token"""
+    cache_key = (token, token_type)
+    now = time.time()
+    with _verified_token_cache_lock:
+        cached = _verified_token_cache.get(cache_key)
+        if cached is not None:
+            user_id, cached_until = cached
+            if now < cached_until:
+                _verified_token_cache.move_to_end(cache_key)
+                return user_id
+            del _verified_token_cache[cache_key]
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -56,12 +77,21 @@ def verify_token(token: str, token_type: str = "access") -> Optional[str]:
         user_id = payload.get("sub")
         if user_id is None:
             return None
-        # Return the user_id string directly, don't convert here
-        # The conversion to ObjectId should happen in the endpoint that uses this
-        return user_id
     except JWTError:
         return None
 
+    cached_until = now + VERIFIED_TOKEN_CACHE_TTL_SECONDS
+    if isinstance(payload.get("exp"), (int, float)):
+        cached_until = min(cached_until, payload["exp"])
+    with _verified_token_cache_lock:
+        _verified_token_cache[cache_key] = (user_id, cached_until)
+        if len(_verified_token_cache) > VERIFIED_TOKEN_CACHE_MAX_SIZE:
+            _verified_token_cache.popitem(last=False)
+
+    # Return the user_id string directly, don't convert here
+    # The conversion to ObjectId should happen in the endpoint that uses this
+    return user_id
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
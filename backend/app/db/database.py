@@ -1,16 +1,21 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
-from motor.core import AgnosticDatabase
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Any, Optional
 
 from app.core.config import settings
 
 
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
-    _db: Optional[AgnosticDatabase] = None
+    client: Optional[AsyncMongoClient] = None
+    _db: Optional[AsyncDatabase] = None
 
     @property
-    def db(self) -> AgnosticDatabase:
+    def db(self) -> AsyncDatabase:
         if self._db is None:
             raise RuntimeError("Database not initialized. Call init_db() first.")
         return self._db
@@ -18,10 +23,24 @@ class Database:
 
 db = Database()
 
+# Items of one user, in insertion order. Also hinted by unclassified-item lookups, since
+# a "field does not exist" filter cannot use the classified_as wildcard index.
+ITEMS_BY_USER_INDEX = [("user_id", 1), ("_id", 1)]
+
+# Taxonomy documents are cached for a few seconds so that the endpoints a frontend workflow
+# hits back to back skip the lookup. Writers must call invalidate_cached_taxonomy.
+TAXONOMY_CACHE_TTL_SECONDS = 5
+TAXONOMY_CACHE_MAX_SIZE = 10_000
+_taxonomy_cache: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+
 
 async def init_db():
     """Initialize database connection"""
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = AsyncMongoClient(
+        settings.MONGODB_URL,
+        compressors=[c for c in settings.MONGODB_COMPRESSORS.split(",") if c],
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+    )
     db._db = db.client[settings.MONGODB_DB_NAME]
 
     # Create indexes
@@ -33,7 +52,7 @@ async def init_db():
 async def close_db():
     """Close database connection"""
     if db.client:
-        db.client.close()
+        await db.client.close()
         print("Disconnected from MongoDB")
 
 
@@ -46,37 +65,86 @@ async def create_indexes():
     await database.users.create_index("google_id", unique=True, sparse=True)
 
     # Taxonomy indexes
-    await database.taxonomies.create_index("user_id")
+    # Ownership checks filter on user_id and _id and only project _id, so this index
+    # covers them; it also serves plain user_id lookups as a prefix
+    await database.taxonomies.create_index([("user_id", 1), ("_id", 1)])
     await database.taxonomies.create_index([("user_id", 1), ("name", 1)], unique=True)
 
+    # Item indexes
+    await database.items.create_index(ITEMS_BY_USER_INDEX)
+    await database.items.create_index([("user_id", 1), ("content", 1)])
+    # classified_as is keyed by taxonomy_id, so a wildcard index covers every
+    # classified_as.{taxonomy_id}.* lookup without one index per taxonomy
+    await database.items.create_index([("classified_as.$**", 1)])
+
+    # Session indexes: background sessions are removed once they expire
+    await database.sessions.create_index("expires_at", expireAfterSeconds=0)
+
     # Note: Node indexes are created per taxonomy collection, not here
     # Each nodes_{taxonomy_id} collection will have its own indexes
 
     print("Database indexes created")
 
 
-def get_db() -> AgnosticDatabase:
+def get_db() -> AsyncDatabase:
     """Get database instance"""
     return db.db
 
 
-def get_user_items_collection(user_id: str):
-    """Get the items collection for a specific user"""
-    return db.db[f"items_{user_id}"]
+def get_items_collection():
+    """Get the items collection shared by all users.
+
+    Every query against it must be scoped with ``{"user_id": user_id}``.
+    """
+    return db.db.items
+
+
+@lru_cache(maxsize=2048)
+def get_taxonomy_nodes_collection(
+    database: AsyncDatabase, taxonomy_id: str
+) -> AsyncCollection:
+    """Get the nodes collection for a specific taxonomy.
 
+    Collection handles are lightweight views on the client, so one handle per
+    database and taxonomy is reused instead of being rebuilt on every request.
+    """
+    return database[f"nodes_{taxonomy_id}"]
 
-def get_taxonomy_nodes_collection(taxonomy_id: str):
-    """Get the nodes collection for a specific taxonomy"""
-    return db.db[f"nodes_{taxonomy_id}"]
 
+async def get_cached_taxonomy(
+    database: AsyncDatabase, taxonomy_id: str, user_id: str
+) -> Optional[dict[str, Any]]:
+    """Get a taxonomy document owned by user_id, or None if there is no such taxonomy"""
+    now = time.monotonic()
+    cached = _taxonomy_cache.get(taxonomy_id)
+    if cached is not None:
+        taxonomy_doc, cached_until = cached
+        if now < cached_until:
+            _taxonomy_cache.move_to_end(taxonomy_id)
+            return taxonomy_doc if taxonomy_doc["user_id"] == user_id else None
+        del _taxonomy_cache[taxonomy_id]
 
-# Not used at the moment because we need to pull all nodes every time and there are not that many nodes.
-async def create_taxonomy_nodes_indexes(taxonomy_id: str):
+    taxonomy_doc = await database.taxonomies.find_one(
+        {"_id": ObjectId(taxonomy_id), "user_id": user_id}
+    )
+    if taxonomy_doc is not None:
+        _taxonomy_cache[taxonomy_id] = (
+            taxonomy_doc,
+            now + TAXONOMY_CACHE_TTL_SECONDS,
+        )
+        if len(_taxonomy_cache) > TAXONOMY_CACHE_MAX_SIZE:
+            _taxonomy_cache.popitem(last=False)
+    return taxonomy_doc
+
+
+def invalidate_cached_taxonomy(taxonomy_id: str) -> None:
+    """Drop a taxonomy from the cache after it was updated or deleted"""
+    _taxonomy_cache.pop(taxonomy_id, None)
+
+
+async def create_taxonomy_nodes_indexes(nodes_collection):
     """Create indexes for a taxonomy-specific nodes collection"""
-    nodes_collection = get_taxonomy_nodes_collection(taxonomy_id)
 
-    # Create indexes
-    await nodes_collection.create_index("node_id", unique=True)
+    # Sibling lookups and positional updates on items.$ match on these
     await nodes_collection.create_index("parent_node_id")
-
-    print(f"Indexes created for nodes_{taxonomy_id}")
+    await nodes_collection.create_index("items.item_id")
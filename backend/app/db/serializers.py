@@ -2,19 +2,37 @@
 MongoDB serialization utilities for handling complex Pydantic models.
 """
 
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Type, TypeVar
 from bson import ObjectId
 from pydantic import BaseModel
-from agents.state import NodeAndConfidence, ItemState, ClassNodeState
+from agents.state import (
+    NodeAndConfidence,
+    ItemState,
+    ItemUnderNode,
+    ClassNodeState,
+    Taxonomy,
+)
 from app.models.item import ItemInDB, ClassifiedAs
 from app.schemas.item import ItemResponse
 from app.schemas.taxonomy import TaxonomyResponse
 from app.models.node import NodeInDB
-from app.schemas.node import NodeCreate
+from app.schemas.node import NodeCreate, NodeResponse
 from app.models.taxonomy import TaxonomyInDB
+from app.models.user import UserInDB
+from app.schemas.user import UserResponse
+from app.models.object_id import PyObjectId
 
 T = TypeVar("T", bound=BaseModel)
 
+# Static defaults of the fields a stored classification has on top of the LLM's
+# NodeAndConfidence output; the updated_at timestamp is filled in separately
+_CLASSIFIED_AS_DEFAULTS = {
+    field: info.default
+    for field, info in ClassifiedAs.model_fields.items()
+    if field not in NodeAndConfidence.model_fields and field != "updated_at"
+}
+
 
 class MongoSerializer:
     """
@@ -45,54 +63,104 @@ class MongoSerializer:
         item: ItemInDB, taxonomy_id: Optional[str] = None
     ) -> ItemResponse:
         """Convert a MongoDB document to an ItemResponse that is ready to be sent to the frontend."""
-        item_dict = item.model_dump(by_alias=False, context={"keep_objectid": False})
+        # ItemInDB is already validated; only the id and classified_as change shape
+        return ItemResponse.model_construct(
+            id=str(item.id),
+            content=item.content,
+            classified_as=(
+                item.classified_as.get(taxonomy_id, []) if taxonomy_id else []
+            ),
+            created_at=item.created_at,
+            updated_at=item.updated_at,
+        )
 
-        # If taxonomy_id is not provided, remove the 'classified_as' field so that ItemResponse uses its default value.
-        if not taxonomy_id:
-            del item_dict["classified_as"]
-            return ItemResponse(**item_dict)
+    @staticmethod
+    def item_taxonomy_projection(taxonomy_id: str) -> Dict[str, int]:
+        """Fields of an item document needed by ItemInDB for a single taxonomy."""
+        return {
+            "content": 1,
+            f"classified_as.{taxonomy_id}": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        }
 
-        if taxonomy_id in item_dict["classified_as"]:
-            item_dict["classified_as"] = [
-                ClassifiedAs(**ca)
-                for ca in item_dict["classified_as"].get(taxonomy_id, [])
-            ]
-        else:
-            item_dict["classified_as"] = []
+    @staticmethod
+    def item_response_projection(taxonomy_id: str) -> Dict[str, Any]:
+        """Fields of an item document needed by serialize_item_doc_to_response.
 
-        return ItemResponse(**item_dict)
+        The server narrows classified_as to the taxonomy's list, so the other
+        taxonomies' classifications never leave the database.
+        """
+        return {
+            "content": 1,
+            "classified_as": {"$ifNull": [f"$classified_as.{taxonomy_id}", []]},
+            "created_at": 1,
+            "updated_at": 1,
+        }
+
+    @staticmethod
+    def serialize_item_doc_to_response(
+        item_doc: Dict[str, Any], taxonomy_id: Optional[str] = None
+    ) -> ItemResponse:
+        """Convert a raw MongoDB document to an ItemResponse.
+
+        Stored items are validated when they are written, so the response is
+        constructed without running the validators again. Documents read with
+        item_response_projection already carry the taxonomy's classified_as list.
+        """
+        classified_as = item_doc.get("classified_as") or []
+        if isinstance(classified_as, dict):
+            classified_as = classified_as.get(taxonomy_id, [])
+        fields = {
+            "id": str(item_doc["_id"]),
+            "content": item_doc["content"],
+            "classified_as": [
+                ClassifiedAs.model_construct(**ca) for ca in classified_as
+            ],
+        }
+        for field in ("created_at", "updated_at"):
+            if field in item_doc:
+                fields[field] = item_doc[field]
+        return ItemResponse.model_construct(**fields)
 
     @staticmethod
     def serialize_item_to_state(item_doc: ItemInDB, taxonomy_id: str) -> ItemState:
         """Convert a MongoDB document to an ItemState."""
-        item_dict = item_doc.model_dump(
-            by_alias=False, context={"keep_objectid": False}
+        # ItemInDB is already validated, so the state is built from its attributes
+        # without a dump/re-validation round trip.
+        return ItemState.model_construct(
+            id=str(item_doc.id),
+            content=item_doc.content,
+            classified_as=[
+                NodeAndConfidence.model_construct(
+                    node_id=ca.node_id, confidence_score=ca.confidence_score
+                )
+                for ca in item_doc.classified_as.get(taxonomy_id, [])
+            ],
         )
 
-        if taxonomy_id in item_dict["classified_as"]:
-            item_dict["classified_as"] = [
-                NodeAndConfidence(**ca)
-                for ca in item_dict["classified_as"].get(taxonomy_id, [])
-            ]
-        else:
-            item_dict["classified_as"] = []
-
-        return ItemState(**item_dict)
-
     @staticmethod
     def deserialize_item_from_state(
-        item: ItemState, taxonomy_id: str
+        item: ItemState, taxonomy_id: str, now: Optional[datetime] = None
     ) -> Dict[str, Any]:
-        """Convert an Item instance to a MongoDB-compatible dictionary."""
+        """Convert an Item instance to a MongoDB-compatible dictionary.
+
+        `now` stamps the classifications' updated_at; batch writers pass one value
+        for the whole batch instead of reading the clock per classification.
+        """
         item_dict = item.model_dump()
+        if now is None:
+            now = datetime.now()
 
-        # Convert NodeAndConfidence objects to dictionaries
-        new_classified_as = {}
-        new_classified_as[taxonomy_id] = [
-            ClassifiedAs(**nc.model_dump()).model_dump()
-            for nc in (item.classified_as or [])
-        ]
-        item_dict["classified_as"] = new_classified_as
+        # The NodeAndConfidence dicts are already dumped; fill in the ClassifiedAs
+        # defaults in place instead of building and dumping a model per entry
+        classified_as = item_dict["classified_as"] or []
+        for ca in classified_as:
+            for field, default in _CLASSIFIED_AS_DEFAULTS.items():
+                if field not in ca:
+                    ca[field] = default
+            ca.setdefault("updated_at", now)
+        item_dict["classified_as"] = {taxonomy_id: classified_as}
 
         return item_dict
 
@@ -103,15 +171,25 @@ class MongoSerializer:
     @staticmethod
     def serialize_node_to_state(node: NodeInDB) -> ClassNodeState:
         """Convert a MongoDB document to a ClassNodeState."""
-        node_dict = node.model_dump(by_alias=False, context={"keep_objectid": False})
-        return ClassNodeState(**node_dict)
+        # NodeInDB is already validated, so the state is built from its attributes
+        fields = {name: getattr(node, name) for name in ClassNodeState.model_fields}
+        fields["id"] = str(node.id)
+        return ClassNodeState.model_construct(**fields)
 
     @staticmethod
-    def deserialize_node_from_state(node: ClassNodeState) -> Dict[str, Any]:
+    def deserialize_node_from_state(
+        node: ClassNodeState, now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
         """Convert a ClassNodeState to a MongoDB-compatible dictionary."""
-        node = NodeInDB(**node.model_dump())
-
-        return node.model_dump(by_alias=True, context={"keep_objectid": True})
+        # Same document NodeInDB would produce, without validating the node twice
+        if now is None:
+            now = datetime.utcnow()
+        return {
+            "_id": PyObjectId.validate(node.id),
+            **node.model_dump(exclude={"id"}),
+            "created_at": now,
+            "updated_at": now,
+        }
 
     @staticmethod
     def deserialize_node_from_request(node: NodeCreate) -> Dict[str, Any]:
@@ -121,16 +199,65 @@ class MongoSerializer:
 
         return node_in_db.model_dump(by_alias=True, context={"keep_objectid": True})
 
+    NODE_RESPONSE_FIELDS = (
+        "parent_node_id",
+        "label",
+        "description",
+        "items",
+        "created_at",
+        "updated_at",
+    )
+
+    @staticmethod
+    def serialize_node_doc_to_response(node_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw MongoDB node document to a NodeResponse-shaped dict.
+
+        Nodes are validated when they are written, so the read path copies the
+        stored fields as they are instead of rebuilding a NodeResponse.
+        """
+        response = {"id": str(node_doc["_id"])}
+        for field in MongoSerializer.NODE_RESPONSE_FIELDS:
+            response[field] = node_doc.get(field)
+        if response["items"] is None:
+            response["items"] = []
+        return response
+
+    @staticmethod
+    def serialize_node_doc_to_model(node_doc: Dict[str, Any]) -> NodeResponse:
+        """Convert a raw MongoDB node document to a NodeResponse without re-validating it."""
+        fields = MongoSerializer.serialize_node_doc_to_response(node_doc)
+        fields["items"] = [ItemUnderNode.model_construct(**i) for i in fields["items"]]
+        return NodeResponse.model_construct(**fields)
+
     # -----------------------------
     # Taxonomy
     # -----------------------------
 
+    @staticmethod
+    def serialize_taxonomy_to_state(taxonomy: TaxonomyInDB) -> Taxonomy:
+        """Convert a MongoDB document to the Taxonomy used by the agents."""
+        fields = {name: getattr(taxonomy, name) for name in Taxonomy.model_fields}
+        fields["id"] = str(taxonomy.id)
+        return Taxonomy.model_construct(**fields)
+
     @staticmethod
     def serialize_taxonomy_to_response(
         taxonomy: TaxonomyInDB,
     ) -> TaxonomyResponse:
         """Convert a MongoDB document to a TaxonomyResponse that is ready to be sent to the frontend."""
+        # TaxonomyInDB is already validated; only the id changes type
+        fields = {name: getattr(taxonomy, name) for name in TaxonomyInDB.model_fields}
+        fields["id"] = str(taxonomy.id)
+        return TaxonomyResponse.model_construct(**fields)
 
-        return TaxonomyResponse(
-            **taxonomy.model_dump(by_alias=False, context={"keep_objectid": False})
-        )
+    # -----------------------------
+    # User
+    # -----------------------------
+
+    @staticmethod
+    def serialize_user_to_response(user: UserInDB) -> UserResponse:
+        """Convert a MongoDB document to a UserResponse that is ready to be sent to the frontend."""
+        # UserInDB is already validated; only the id changes type
+        fields = {name: getattr(user, name) for name in UserInDB.model_fields}
+        fields["id"] = str(user.id)
+        return UserResponse.model_construct(**fields)
@@ -16,6 +16,7 @@ class ClassificationResponse(BaseModel):
     message: str
     items_classified: int
     status: str
+    session_id: Optional[str] = None
 
 
 class ExaminationRequest(BaseModel):
@@ -27,6 +28,7 @@ class ExaminationResponse(BaseModel):
     message: str
     nodes_examined: List[str]
     status: str
+    session_id: Optional[str] = None
 
 
 class ClassificationStatusResponse(BaseModel):
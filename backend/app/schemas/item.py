@@ -1,6 +1,5 @@
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field, field_validator
-from bson import ObjectId
+from pydantic import BaseModel, Field
 from app.models.item import ItemInDB, ClassifiedAs
 
 
@@ -24,12 +23,6 @@ class ItemResponse(ItemInDB):
         default_factory=list
     )  # Not a dictionary but a list! Only return the list of ClassifiedAs for the selected taxonomy.
 
-    @field_validator("id", mode="before")
-    def validate_id(cls, v):
-        if not isinstance(v, ObjectId):
-            return str(v)
-        return v
-
 
 class ItemInResponse(BaseModel):
     item: ItemResponse
@@ -1,6 +1,5 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
-from bson import ObjectId
+from pydantic import BaseModel, Field
 
 from app.models.node import NodeInDB
 from agents.state import ItemUnderNode
@@ -9,12 +8,6 @@ from agents.state import ItemUnderNode
 class NodeResponse(NodeInDB):
     id: str = Field(default_factory=str)
 
-    @field_validator("id", mode="before")
-    def validate_id(cls, v):
-        if not isinstance(v, ObjectId):
-            return str(v)
-        return v
-
 
 class NodeCreate(NodeInDB):
     pass
@@ -1,6 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field, field_validator
-from bson import ObjectId
+from pydantic import BaseModel, Field
 
 from app.models.taxonomy import TaxonomyInDB, ClassifierState
 
@@ -23,12 +22,6 @@ class TaxonomyResponse(TaxonomyInDB):
 
     id: str = Field(default_factory=str)
 
-    @field_validator("id", mode="before")
-    def validate_id(cls, v):
-        if not isinstance(v, ObjectId):
-            return str(v)
-        return v
-
 
 class TaxonomyInResponse(BaseModel):
     taxonomy: TaxonomyResponse
@@ -1,5 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
-from bson import ObjectId
+from pydantic import BaseModel, Field
 
 from app.models.user import UserInDB
 
@@ -7,12 +6,6 @@ from app.models.user import UserInDB
 class UserBase(UserInDB):
     id: str = Field(default_factory=str)
 
-    @field_validator("id", mode="before")
-    def validate_id(cls, v):
-        if not isinstance(v, ObjectId):
-            return str(v)
-        return v
-
 
 class UserCreate(UserBase):
     pass
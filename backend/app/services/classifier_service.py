@@ -4,7 +4,7 @@ from enum import Enum
 from datetime import datetime
 from typing import List, Optional, Union, overload, Literal
 
-from motor.core import AgnosticDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo import UpdateOne
 from bson import ObjectId
 
@@ -18,6 +18,7 @@ from agents.state import (
     Taxonomy,
     InterruptType,
     ItemUnderNode,
+    ReducerOp,
 )
 from agents.llm_factory import OpenAIModel, AnthropicModel, AIModel, string_to_ai_model
 
@@ -34,6 +35,11 @@ from app.models.node import NodeInDB
 from app.models.item import ItemInDB
 from app.websocket.manager import ConnectionManager
 from app.db.serializers import MongoSerializer
+from app.db.database import (
+    get_taxonomy_nodes_collection,
+    invalidate_cached_taxonomy,
+    ITEMS_BY_USER_INDEX,
+)
 from app.models.taxonomy import ClassifierState
 
 logger = logging.getLogger(__name__)
@@ -66,7 +72,7 @@ class ClassifierService:
         connection_manager: ConnectionManager,
         taxonomy_id: str,
         user_id: str,
-        db: Optional[AgnosticDatabase] = None,
+        db: Optional[AsyncDatabase] = None,
     ):
         self.connection_manager = connection_manager
         self.taxonomy_id = taxonomy_id
@@ -103,7 +109,7 @@ class ClassifierService:
         connection_manager: ConnectionManager,
         taxonomy_id: str,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
     ) -> "ClassifierService":
         """Factory method to create a ClassifierService instance with state loaded from DB"""
         instance = cls(connection_manager, taxonomy_id, user_id, db)
@@ -174,12 +180,11 @@ class ClassifierService:
             await self.db.taxonomies.update_one(
                 {"_id": ObjectId(self.taxonomy_id)},
                 {
-                    "$set": {
-                        "classifier_state": state.model_dump(),
-                        "updated_at": datetime.utcnow(),
-                    }
+                    "$set": {"classifier_state": state.model_dump()},
+                    "$currentDate": {"updated_at": True},
                 },
             )
+            invalidate_cached_taxonomy(self.taxonomy_id)
 
             logger.info(f"Saved classifier state for taxonomy {self.taxonomy_id}")
         except Exception as e:
@@ -245,7 +250,7 @@ class ClassifierService:
         self,
         taxonomy_id: str,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
         force_node_ids: Optional[List[str]] = None,
     ) -> List[ClassNodeState]:
         """
@@ -253,7 +258,7 @@ class ClassifierService:
         Fetches nodes from database and evaluates them for examination.
         """
         # Get nodes from database
-        nodes_collection = db[f"nodes_{taxonomy_id}"]
+        nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
         nodes_cursor = nodes_collection.find({})
         nodes_docs = await nodes_cursor.to_list(length=None)
 
@@ -297,29 +302,30 @@ class ClassifierService:
         return nodes_to_examine
 
     async def _update_nodes_and_items_after_classification(
-        self, taxonomy_id: str, db: AgnosticDatabase
+        self, taxonomy_id: str, db: AsyncDatabase
     ):
         """Update nodes in database after classification without maintaining in-memory state"""
         classified_items = self.get_snapshot_value(classify_g, SnapshotKey.ITEMS)
         nodes_from_snapshot = self.get_snapshot_value(classify_g, SnapshotKey.NODES)
-        items_collection = db[f"items_{self.user_id}"]
-        nodes_collection = db[f"nodes_{taxonomy_id}"]
+        items_collection = db.items
+        nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
 
         if classified_items:
-            # Bulk update items in database
+            # Bulk update items in database, stamping the batch with one timestamp
+            classified_at = datetime.now()
             item_updates = []
             for item in classified_items:
                 item_updates.append(
                     UpdateOne(
-                        {"_id": ObjectId(item.id)},
+                        {"user_id": self.user_id, "_id": ObjectId(item.id)},
                         {
                             "$set": MongoSerializer.deserialize_item_from_state(
-                                item, taxonomy_id
+                                item, taxonomy_id, classified_at
                             )
                         },
                     )
                 )
-            await items_collection.bulk_write(item_updates)
+            await items_collection.bulk_write(item_updates, ordered=False)
 
             # Bulk update nodes in database
             node_to_items_dict = {}
@@ -329,7 +335,7 @@ class ClassifierService:
                         if node_and_confidence.node_id not in node_to_items_dict:
                             node_to_items_dict[node_and_confidence.node_id] = []
                         node_to_items_dict[node_and_confidence.node_id].append(
-                            ItemUnderNode(
+                            ItemUnderNode.model_construct(
                                 item_id=item.id,
                                 confidence_score=node_and_confidence.confidence_score,
                             ).model_dump()
@@ -343,25 +349,28 @@ class ClassifierService:
                             {"_id": ObjectId(node_id)},
                             {
                                 "$push": {"items": {"$each": items}},
-                                "$set": {"updated_at": datetime.utcnow()},
+                                "$currentDate": {"updated_at": True},
                             },
                         )
                     )
-                await nodes_collection.bulk_write(node_updates)
+                await nodes_collection.bulk_write(node_updates, ordered=False)
 
         # Check for new nodes and insert them
         if nodes_from_snapshot:
-            existing_nodes_cursor = nodes_collection.find({})
+            existing_nodes_cursor = nodes_collection.find({}, projection={"_id": 1})
             existing_nodes_docs = await existing_nodes_cursor.to_list(length=None)
-            existing_node_ids = [str(doc["_id"]) for doc in existing_nodes_docs]
+            existing_node_ids = {str(doc["_id"]) for doc in existing_nodes_docs}
 
-            for node_from_snapshot in nodes_from_snapshot:
-                if node_from_snapshot.id not in existing_node_ids:
-                    # Insert new node
-                    node = MongoSerializer.deserialize_node_from_state(
-                        node_from_snapshot
-                    )
-                    await nodes_collection.insert_one(node)
+            created_at = datetime.utcnow()
+            new_nodes = [
+                MongoSerializer.deserialize_node_from_state(
+                    node_from_snapshot, created_at
+                )
+                for node_from_snapshot in nodes_from_snapshot
+                if node_from_snapshot.id not in existing_node_ids
+            ]
+            if new_nodes:
+                await nodes_collection.insert_many(new_nodes, ordered=False)
 
     def _update_config_for_examine_nodes_graph(self):
         current_time = datetime.now().strftime("%m%d_%H%M%S")
@@ -402,12 +411,12 @@ class ClassifierService:
         items: List[ItemState],
         llm_name: str,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
     ):
         """Create initial nodes for a taxonomy"""
         try:
             # Check if nodes already exist
-            nodes_collection = db[f"nodes_{taxonomy_id}"]
+            nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
             existing_count = await nodes_collection.count_documents({})
             if existing_count > 0:
                 logger.warning("Nodes already exist. Skipping initial nodes creation.")
@@ -456,9 +465,13 @@ class ClassifierService:
             nodes = self.get_snapshot_value(initial_batch_g, SnapshotKey.NODES, config)
 
             # Save nodes to database
-            for node in nodes:
-                await nodes_collection.insert_one(
-                    MongoSerializer.deserialize_node_from_state(node)
+            if nodes:
+                await nodes_collection.insert_many(
+                    [
+                        MongoSerializer.deserialize_node_from_state(node)
+                        for node in nodes
+                    ],
+                    ordered=False,
                 )
 
             # Send completion message
@@ -479,7 +492,7 @@ class ClassifierService:
         taxonomy: Taxonomy,
         taxonomy_id: str,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
         models: Optional[List[AIModel]] = None,
         majority_threshold: Optional[float] = None,
         total_invocations: Optional[int] = None,
@@ -487,7 +500,7 @@ class ClassifierService:
     ):
         """Initialize the classification graph with nodes from database"""
         # Get nodes from database
-        nodes_collection = db[f"nodes_{taxonomy_id}"]
+        nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
         nodes_cursor = nodes_collection.find({})
         nodes_docs = await nodes_cursor.to_list(length=None)
         nodes = [NodeInDB(**node_doc) for node_doc in nodes_docs]
@@ -524,7 +537,7 @@ class ClassifierService:
         taxonomy: Taxonomy,
         batch_size: int,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
         models: Optional[List[AIModel]] = None,
         majority_threshold: Optional[float] = None,
         total_invocations: Optional[int] = None,
@@ -544,10 +557,16 @@ class ClassifierService:
                 )
 
             # Get unclassified items (items not classified to any node in this taxonomy)
-            user_items_collection = db[f"items_{user_id}"]
-            cursor = user_items_collection.find(
-                {f"classified_as.{taxonomy_id}": {"$exists": False}}
-            ).limit(batch_size)
+            cursor = (
+                db.items.find(
+                    {
+                        "user_id": user_id,
+                        f"classified_as.{taxonomy_id}": {"$exists": False},
+                    }
+                )
+                .hint(ITEMS_BY_USER_INDEX)
+                .limit(batch_size)
+            )
             items = await cursor.to_list(length=batch_size)
             items = [ItemInDB(**item) for item in items]
             items = [
@@ -557,7 +576,7 @@ class ClassifierService:
             if not items:
                 raise Exception("No items left to classify. Please add more items.")
 
-            nodes_collection = db[f"nodes_{taxonomy_id}"]
+            nodes_collection = get_taxonomy_nodes_collection(db, taxonomy_id)
             nodes_cursor = nodes_collection.find({})
             nodes_docs = await nodes_cursor.to_list(length=None)
             nodes = [NodeInDB(**node_doc) for node_doc in nodes_docs]
@@ -575,16 +594,8 @@ class ClassifierService:
             classify_g.update_state(
                 self.config_for_classify_items_graph,
                 {
-                    "items": items + [ItemState(id="REPLACE_ALL", content="")],
-                    "nodes": nodes
-                    + [
-                        ClassNodeState(
-                            id="REPLACE_ALL",
-                            parent_node_id="",
-                            label="",
-                            description="",
-                        )
-                    ],
+                    "items": [ReducerOp.REPLACE_ALL] + items,
+                    "nodes": [ReducerOp.REPLACE_ALL] + nodes,
                     **classificication_config,
                 },
             )
@@ -648,7 +659,7 @@ class ClassifierService:
         message: str,
         taxonomy_id: str,
         user_id: str,
-        db: AgnosticDatabase,
+        db: AsyncDatabase,
     ):
         """Resume classification after human feedback"""
         try:
@@ -1,13 +1,50 @@
 import time
+import asyncio
 import dspy
 import os
 import json
-from typing import List, Any
+import hashlib
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import List, Any, Optional
 from enum import Enum
-from datetime import datetime
 from app.websocket.manager import ConnectionManager
 
 COMPILED_MODULE_ROOT_PATH = "app/services/compiled_dspy_modules/"
+DEFAULT_DSPY_MODEL = "openai/gpt-4o-mini"
+
+
+# BootstrapFewShot runs synchronous, CPU-heavy Python, so it is compiled in worker
+# processes to keep the event loop free and let optimizations run on separate cores.
+_compile_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+@lru_cache(maxsize=None)
+def get_dspy_lm(model: str = DEFAULT_DSPY_MODEL) -> dspy.LM:
+    """Shared dspy.LM per model so repeated optimizations reuse one client."""
+    return dspy.LM(model)
+
+
+def get_compile_process_pool() -> ProcessPoolExecutor:
+    global _compile_process_pool
+    if _compile_process_pool is None:
+        # Spawned workers start from a clean interpreter instead of forking the server
+        # process with its event loop, open sockets and client threads.
+        _compile_process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _compile_process_pool
+
+
+def shutdown_compile_process_pool():
+    """Cancel queued compiles and release the pool without waiting for running ones."""
+    global _compile_process_pool
+    if _compile_process_pool is not None:
+        _compile_process_pool.shutdown(wait=False, cancel_futures=True)
+        _compile_process_pool = None
 
 
 class DspyOptimizer(dspy.Module):
@@ -51,6 +88,26 @@ class DspyOptimizer(dspy.Module):
 
         return ClassificationResult
 
+    def _compiled_module_id(self) -> str:
+        # Same trainset, categories, model and settings compile to the same module,
+        # so the id doubles as a cache key for previously compiled modules.
+        payload = {
+            "trainset": sorted(
+                (example.review, example.category) for example in self.trainset
+            ),
+            "categories": sorted(self.categories),
+            "lm": self.lm.model,
+            "settings": [
+                self.metric_threshold,
+                self.max_bootstrapped_demos,
+                self.max_labeled_demos,
+                self.max_rounds,
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(payload, ensure_ascii=False).encode()
+        ).hexdigest()[:16]
+
     def _metric_function(self, ground_truth, prediction, trace=None):
         # Check if the predicted category matches the ground truth
         pred_category = prediction.get("category", None)
@@ -71,7 +128,60 @@ class DspyOptimizer(dspy.Module):
 
     async def compile(self):
         # Compile returns the optimized module
+        compiled_module_id = self._compiled_module_id()
+        compiled_module_path = os.path.join(
+            self.compiled_module_root_path, compiled_module_id + ".json"
+        )
+        if os.path.exists(compiled_module_path):
+            if _is_readable_compiled_module(compiled_module_path):
+                print(f"DSPy optimizer cache hit: {compiled_module_id}")
+                await self._send_compiled_module(compiled_module_id)
+                return compiled_module_id
+            # Left behind by an older, interrupted save; compile it again
+            print(f"DSPy optimizer discarding unreadable module: {compiled_module_id}")
+            try:
+                os.remove(compiled_module_path)
+            except FileNotFoundError:
+                pass
+
+        print(f"DSPy optimizer module_id: {compiled_module_id}")
+
+        await self.connection_manager.send_dspy_update(
+            user_id=self.user_id,
+            data={
+                "message": f"Start optimizing few-shot with {len(self.trainset)} examples! Will send you a notification when it's done!",
+                "compiled_module_id": compiled_module_id,
+            },
+        )
 
+        # The optimizer is rebuilt in the worker process from plain arguments,
+        # since the LM client and the connection manager cannot be pickled.
+        compile_duration = await asyncio.get_running_loop().run_in_executor(
+            get_compile_process_pool(),
+            partial(
+                _compile_in_worker_process,
+                model=self.lm.model,
+                user_id=self.user_id,
+                node_id=self.node_id,
+                categories=self.categories,
+                trainset=self.trainset,
+                metric_threshold=self.metric_threshold,
+                max_bootstrapped_demos=self.max_bootstrapped_demos,
+                max_labeled_demos=self.max_labeled_demos,
+                max_rounds=self.max_rounds,
+                compiled_module_path=compiled_module_path,
+            ),
+        )
+        print(f"DSPy compile took {compile_duration:.2f} seconds")
+
+        if compile_duration < 120:
+            await asyncio.sleep(120 - compile_duration)
+
+        await self._send_compiled_module(compiled_module_id)
+        return compiled_module_id
+
+    def compile_and_save(self, compiled_module_path: str) -> float:
+        """Run BootstrapFewShot and save the result; returns the compile duration."""
         dspy.configure(lm=self.lm, callbacks=self.callbacks)
 
         signature = self._create_signature(self.categories)
@@ -88,40 +198,36 @@ class DspyOptimizer(dspy.Module):
             max_errors=1,
         )
 
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        print(f"DSPy optimizer module_id: {current_time}")
-
-        await self.connection_manager.send_dspy_update(
-            user_id=self.user_id,
-            data={
-                "message": f"Start optimizing few-shot with {len(self.trainset)} examples! Will send you a notification when it's done!",
-                "compiled_module_id": current_time,
-            },
-        )
-
         start_time = time.time()
         compiled_classifier = bootstrap_module.compile(
             student=student, trainset=self.trainset
         )
-        end_time = time.time()
-        print(f"DSPy compile took {end_time - start_time:.2f} seconds")
-
-        if end_time - start_time < 120:
-            time.sleep(120 - (end_time - start_time))
+        compile_duration = time.time() - start_time
 
-        compiled_classifier.save(
-            os.path.join(self.compiled_module_root_path, current_time + ".json")
+        # Saved next to the final path and moved into place, so a concurrent or
+        # interrupted compile never leaves a partial file at the cache key
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(compiled_module_path), prefix=".", suffix=".tmp.json"
         )
+        os.close(fd)
+        try:
+            compiled_classifier.save(temp_path)
+            os.replace(temp_path, compiled_module_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return compile_duration
+
+    async def _send_compiled_module(self, compiled_module_id: str):
         await self.connection_manager.send_dspy_update(
             user_id=self.user_id,
             data={
                 "message": f"Selected {len(self.trainset)} few shot examples.",
-                "compiled_module_id": current_time,
-                "demos": return_demos(current_time),
+                "compiled_module_id": compiled_module_id,
+                "demos": return_demos(compiled_module_id),
                 "node_id": self.node_id,
             },
         )
-        return current_time
 
     async def predict(
         self,
@@ -140,6 +246,60 @@ class DspyOptimizer(dspy.Module):
         return classifier(review=review)
 
 
+def _compile_in_worker_process(
+    model: str,
+    user_id: str,
+    node_id: str,
+    categories: List[str],
+    trainset: List[dspy.Example],
+    metric_threshold: float,
+    max_bootstrapped_demos: int,
+    max_labeled_demos: int,
+    max_rounds: int,
+    compiled_module_path: str,
+) -> float:
+    dspy_optimizer = DspyOptimizer(
+        lm=get_dspy_lm(model),
+        connection_manager=None,
+        user_id=user_id,
+        node_id=node_id,
+        categories=categories,
+        trainset=trainset,
+        metric_threshold=metric_threshold,
+        max_bootstrapped_demos=max_bootstrapped_demos,
+        max_labeled_demos=max_labeled_demos,
+        max_rounds=max_rounds,
+    )
+    return dspy_optimizer.compile_and_save(compiled_module_path)
+
+
+async def run_dspy_optimizer(
+    connection_manager: ConnectionManager,
+    user_id: str,
+    node_id: str,
+    categories: List[str],
+    trainset: List[dspy.Example],
+):
+    """Build the optimizer and compile it; meant to run as a background task."""
+    dspy_optimizer = DspyOptimizer(
+        lm=get_dspy_lm(),
+        connection_manager=connection_manager,
+        user_id=user_id,
+        node_id=node_id,
+        categories=categories,
+        trainset=trainset,
+    )
+    return await dspy_optimizer.compile()
+
+
+def _is_readable_compiled_module(compiled_module_path: str) -> bool:
+    try:
+        with open(compiled_module_path, "r") as f:
+            return isinstance(json.load(f)["demos"], list)
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
 def return_demos(compiled_module_id: str) -> List[str]:
     with open(
         os.path.join(COMPILED_MODULE_ROOT_PATH, compiled_module_id + ".json"),
@@ -1,6 +1,6 @@
 from typing import Dict, List, Set
 from fastapi import WebSocket
-import json
+import orjson
 import asyncio
 from datetime import datetime
 import logging
@@ -29,14 +29,14 @@ class ConnectionManager:
                             },
                             websocket,
                         )
-                        logger.debug(f"Sent keepalive ping to user {user_id}")
+                        logger.debug("Sent keepalive ping to user %s", user_id)
                     except Exception as e:
                         logger.error(
                             f"Failed to send keepalive ping to user {user_id}: {e}"
                         )
                         break
         except asyncio.CancelledError:
-            logger.debug(f"Keepalive task cancelled for user {user_id}")
+            logger.debug("Keepalive task cancelled for user %s", user_id)
         except Exception as e:
             logger.error(f"Error in keepalive loop for user {user_id}: {e}")
 
@@ -68,10 +68,17 @@ class ConnectionManager:
                 f"User {user_id} disconnected. Remaining connections: {len(self.active_connections)}"
             )
 
+    @staticmethod
+    async def _send_json(websocket: WebSocket, message: dict):
+        """Send a message as a JSON text frame, encoded with orjson instead of json.dumps"""
+        await websocket.send_text(
+            orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+        )
+
     async def send_directly_with_websocket(self, message: dict, websocket: WebSocket):
         """Send message to specific WebSocket"""
         try:
-            await websocket.send_json(message)
+            await self._send_json(websocket, message)
         except Exception as e:
             logger.error(f"Error sending message directly to websocket: {e}")
             raise  # Re-raise to let caller handle it
@@ -86,7 +93,7 @@ class ConnectionManager:
                     websocket.client_state.name == "CONNECTED"
                     and websocket.application_state.name == "CONNECTED"
                 ):
-                    await websocket.send_json(message)
+                    await self._send_json(websocket, message)
                 else:
                     logger.warning(
                         f"WebSocket for user {user_id} is not in CONNECTED state. Client: {websocket.client_state.name}, App: {websocket.application_state.name}"
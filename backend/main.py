@@ -15,23 +15,31 @@ if os.getenv("LANGGRAPH_STUDIO") == "true":
 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.database import init_db, close_db
+from app.api.v1.endpoints.auth import load_google_server_metadata
 from app.websocket.manager import connection_manager
+from app.services.dspy_optimizer import shutdown_compile_process_pool
+from agents.llm_factory import open_http_async_client, close_http_async_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await load_google_server_metadata()
+    open_http_async_client(settings.LLM_MAX_CONCURRENCY)
     yield
     # Shutdown
     await close_db()
     await connection_manager.disconnect_all()
+    await close_http_async_client()
+    shutdown_compile_process_pool()
 
 
 app = FastAPI(
@@ -39,6 +47,7 @@ app = FastAPI(
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS
@@ -0,0 +1,117 @@
+"""Move legacy per-user ``items_{user_id}`` collections into the shared ``items`` collection.
+
+Run once per deployment, from the backend directory:
+
+    uv run python -m scripts.migrate_user_items
+
+The migration is idempotent: items that were already moved are skipped, so it
+can be re-run safely after an interruption.
+"""
+
+import asyncio
+import hashlib
+import logging
+
+from bson import ObjectId
+from pymongo.asynchronous.database import AsyncDatabase
+
+from app.db.database import (
+    close_db,
+    db,
+    get_taxonomy_nodes_collection,
+    init_db,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def remapped_item_id(user_id: str, item_id: ObjectId) -> ObjectId:
+    """Id given to a legacy item whose _id is already used by another user's item.
+
+    Derived from the user and the old id, so a re-run picks the same id.
+    """
+    return ObjectId(hashlib.sha1(f"{user_id}:{item_id}".encode()).digest()[:12])
+
+
+async def migrate_user_items_collection(database: AsyncDatabase, name: str) -> int:
+    """Move one legacy items collection into ``items`` and drop it.
+
+    Items copied from ``sample_items`` share their ``_id`` across users, so
+    colliding items get a new id and the node references in the user's
+    taxonomies are rewritten to match. Returns the number of items inserted.
+    """
+    user_id = name.removeprefix("items_")
+    docs = await database[name].find({}).to_list(length=None)
+
+    candidate_ids = [doc["_id"] for doc in docs] + [
+        remapped_item_id(user_id, doc["_id"]) for doc in docs
+    ]
+    owners = {
+        doc["_id"]: doc["user_id"]
+        async for doc in database.items.find(
+            {"_id": {"$in": candidate_ids}}, projection={"user_id": 1}
+        )
+    }
+
+    to_insert = []
+    remapped_ids = {}
+    for doc in docs:
+        owner = owners.get(doc["_id"])
+        if owner == user_id:
+            continue
+        if owner is not None:
+            new_id = remapped_item_id(user_id, doc["_id"])
+            remapped_ids[str(doc["_id"])] = str(new_id)
+            if owners.get(new_id) == user_id:
+                continue
+            doc["_id"] = new_id
+        doc["user_id"] = user_id
+        to_insert.append(doc)
+
+    if to_insert:
+        await database.items.insert_many(to_insert)
+
+    if remapped_ids:
+        async for taxonomy in database.taxonomies.find(
+            {"user_id": user_id}, projection={"_id": 1}
+        ):
+            nodes_collection = get_taxonomy_nodes_collection(
+                database, str(taxonomy["_id"])
+            )
+            for old_id, new_id in remapped_ids.items():
+                await nodes_collection.update_many(
+                    {"items.item_id": old_id},
+                    {"$set": {"items.$[item].item_id": new_id}},
+                    array_filters=[{"item.item_id": old_id}],
+                )
+
+    # Only dropped once every item and node reference was moved
+    await database[name].drop()
+    logger.info(f"Migrated {len(to_insert)} of {len(docs)} items from {name}")
+    return len(to_insert)
+
+
+async def migrate_user_items_collections(database: AsyncDatabase) -> None:
+    """Move every legacy per-user items collection into ``items``"""
+    legacy_names = await database.list_collection_names(
+        filter={"name": {"$regex": r"^items_"}}
+    )
+    if not legacy_names:
+        logger.info("No legacy items collections to migrate")
+        return
+
+    for name in legacy_names:
+        await migrate_user_items_collection(database, name)
+
+
+async def main() -> None:
+    await init_db()
+    try:
+        await migrate_user_items_collections(db.db)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
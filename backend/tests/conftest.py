@@ -3,12 +3,12 @@ Pytest configuration and shared fixtures for API tests.
 """
 
 import asyncio
+import mongomock
 import pytest
 from typing import AsyncGenerator, Dict, Any
 from httpx import AsyncClient, ASGITransport
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from mongomock_motor import AsyncMongoMockClient
 from fastapi import FastAPI
+from fastapi.responses import RedirectResponse
 from jose import jwt
 from datetime import datetime, timedelta
 from bson import ObjectId
@@ -22,7 +22,6 @@ from app.models.taxonomy import TaxonomyInDB
 from app.models.node import NodeInDB
 from agents.state import ItemState, Example, ItemUnderNode, NodeAndConfidence
 
-
 # Override settings for testing
 settings.MONGODB_DB_NAME = "test_taxonomy_agent"
 settings.SECRET_KEY = "test-secret-key"
@@ -30,6 +29,113 @@ settings.GOOGLE_CLIENT_ID = "test-client-id"
 settings.GOOGLE_CLIENT_SECRET = "test-client-secret"
 
 
+class AsyncMockCursor:
+    """Async facade over a mongomock cursor, shaped like pymongo's AsyncCursor."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        # sort/skip/limit/batch_size/hint chain like AsyncCursor
+        method = getattr(self._cursor, name)
+
+        def chain(*args, **kwargs):
+            method(*args, **kwargs)
+            return self
+
+        return chain
+
+    def hint(self, index):
+        # mongomock does not know the app's index names; hints only affect plans
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        documents = []
+        for document in self._cursor:
+            documents.append(document)
+            if length is not None and len(documents) >= length:
+                break
+        return documents
+
+
+class AsyncMockCollection:
+    """Async facade over a mongomock collection, shaped like pymongo's AsyncCollection."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    @property
+    def name(self):
+        return self._collection.name
+
+    def find(self, *args, **kwargs):
+        return AsyncMockCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, *args, **kwargs):
+        return AsyncMockCursor(iter(self._collection.aggregate(*args, **kwargs)))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncMockDatabase:
+    """Async facade over a mongomock database, shaped like pymongo's AsyncDatabase."""
+
+    def __init__(self, database):
+        self._database = database
+        self._collections = {}
+
+    @property
+    def name(self):
+        return self._database.name
+
+    def get_collection(self, name):
+        if name not in self._collections:
+            self._collections[name] = AsyncMockCollection(self._database[name])
+        return self._collections[name]
+
+    __getitem__ = get_collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    async def list_collection_names(self, *args, **kwargs):
+        return self._database.list_collection_names(*args, **kwargs)
+
+    async def drop_collection(self, name):
+        self._collections.pop(name, None)
+        return self._database.drop_collection(name)
+
+
+class AsyncMockClient:
+    """Async facade over a mongomock client, shaped like pymongo's AsyncMongoClient."""
+
+    def __init__(self):
+        self._client = mongomock.MongoClient()
+
+    def __getitem__(self, name):
+        return AsyncMockDatabase(self._client[name])
+
+    async def close(self):
+        self._client.close()
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
@@ -39,16 +145,16 @@ def event_loop():
 
 
 @pytest.fixture
-async def mock_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
+async def mock_db() -> AsyncGenerator[AsyncMockDatabase, None]:
     """Create a mock MongoDB database for testing."""
-    client = AsyncMongoMockClient()
+    client = AsyncMockClient()
     db = client[settings.MONGODB_DB_NAME]
     yield db
-    client.close()
+    await client.close()
 
 
 @pytest.fixture
-def app(mock_db: AsyncIOMotorDatabase) -> FastAPI:
+def app(mock_db: AsyncMockDatabase) -> FastAPI:
     """Create a FastAPI app instance for testing."""
     from main import app as _app
 
@@ -69,7 +175,7 @@ async def client(app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
 
 
 @pytest.fixture
-async def test_user(mock_db: AsyncIOMotorDatabase) -> UserInDB:
+async def test_user(mock_db: AsyncMockDatabase) -> UserInDB:
     """Create a test user in the database."""
     user = UserInDB(
         email="test@example.com",
@@ -80,13 +186,15 @@ async def test_user(mock_db: AsyncIOMotorDatabase) -> UserInDB:
         is_superuser=False,
     )
 
-    result = await mock_db.users.insert_one(user.model_dump(by_alias=True))
+    result = await mock_db.users.insert_one(
+        user.model_dump(by_alias=True, context={"keep_objectid": True})
+    )
     user_doc = await mock_db.users.find_one({"_id": result.inserted_id})
     return UserInDB(**user_doc)
 
 
 @pytest.fixture
-async def superuser(mock_db: AsyncIOMotorDatabase) -> UserInDB:
+async def superuser(mock_db: AsyncMockDatabase) -> UserInDB:
     """Create a superuser for testing."""
     user = UserInDB(
         email="admin@example.com",
@@ -96,7 +204,9 @@ async def superuser(mock_db: AsyncIOMotorDatabase) -> UserInDB:
         is_superuser=True,
     )
 
-    result = await mock_db.users.insert_one(user.model_dump(by_alias=True))
+    result = await mock_db.users.insert_one(
+        user.model_dump(by_alias=True, context={"keep_objectid": True})
+    )
     user_doc = await mock_db.users.find_one({"_id": result.inserted_id})
     return UserInDB(**user_doc)
 
@@ -117,7 +227,7 @@ def superuser_headers(superuser: UserInDB) -> Dict[str, str]:
 
 @pytest.fixture
 async def test_taxonomy(
-    mock_db: AsyncIOMotorDatabase, test_user: UserInDB
+    mock_db: AsyncMockDatabase, test_user: UserInDB
 ) -> TaxonomyInDB:
     """Create a test taxonomy."""
     taxonomy = TaxonomyInDB(
@@ -126,14 +236,16 @@ async def test_taxonomy(
         aspect="category",
     )
 
-    result = await mock_db.taxonomies.insert_one(taxonomy.model_dump(by_alias=True))
+    result = await mock_db.taxonomies.insert_one(
+        taxonomy.model_dump(by_alias=True, context={"keep_objectid": True})
+    )
     taxonomy_doc = await mock_db.taxonomies.find_one({"_id": result.inserted_id})
     return TaxonomyInDB(**taxonomy_doc)
 
 
 @pytest.fixture
 async def test_nodes(
-    mock_db: AsyncIOMotorDatabase, test_taxonomy: TaxonomyInDB, test_user: UserInDB
+    mock_db: AsyncMockDatabase, test_taxonomy: TaxonomyInDB, test_user: UserInDB
 ) -> list[NodeInDB]:
     """Create test nodes for a taxonomy."""
     nodes = [
@@ -190,7 +302,9 @@ async def test_nodes(
     # Insert nodes
     node_docs = []
     for node in nodes:
-        result = await mock_db.nodes.insert_one(node.model_dump(by_alias=True))
+        result = await mock_db.nodes.insert_one(
+            node.model_dump(by_alias=True, context={"keep_objectid": True})
+        )
         node_docs.append(await mock_db.nodes.find_one({"_id": result.inserted_id}))
 
     return [NodeInDB(**doc) for doc in node_docs]
@@ -198,7 +312,7 @@ async def test_nodes(
 
 @pytest.fixture
 async def test_items(
-    mock_db: AsyncIOMotorDatabase, test_user: UserInDB
+    mock_db: AsyncMockDatabase, test_user: UserInDB
 ) -> list[ItemState]:
     """Create test items for classification."""
     items = [
@@ -224,9 +338,10 @@ async def test_items(
         ),
     ]
 
-    collection_name = f"items_{str(test_user.id)}"
     for item in items:
-        await mock_db[collection_name].insert_one(item.model_dump())
+        await mock_db.items.insert_one(
+            {**item.model_dump(), "user_id": str(test_user.id)}
+        )
 
     return items
 
@@ -234,29 +349,25 @@ async def test_items(
 @pytest.fixture
 def mock_google_oauth(mocker):
     """Mock Google OAuth responses."""
-    # Mock the OAuth client
-    mock_client = mocker.patch("app.api.v1.endpoints.auth.oauth.create_client")
-    mock_authorize = mocker.AsyncMock()
-    mock_authorize.headers = {
-        "Location": "https://accounts.google.com/oauth/authorize?..."
-    }
-    mock_client.return_value.authorize_redirect = mocker.AsyncMock(
-        return_value=mock_authorize
+    # The Google client is created once at import, so patch the module-level instance
+    mock_client = mocker.patch("app.api.v1.endpoints.auth.google_client")
+    mock_client.authorize_redirect = mocker.AsyncMock(
+        return_value=RedirectResponse(
+            url="https://accounts.google.com/o/oauth2/v2/auth?client_id=test"
+        )
     )
 
     # Mock token exchange
     mock_token = {
         "access_token": "google-access-token",
         "userinfo": {
-            "id": "google-123",
+            "sub": "google-123",
             "email": "test@example.com",
             "name": "Test User",
             "picture": "https://example.com/picture.jpg",
         },
     }
-    mock_client.return_value.authorize_access_token = mocker.AsyncMock(
-        return_value=mock_token
-    )
+    mock_client.authorize_access_token = mocker.AsyncMock(return_value=mock_token)
 
     return mock_client
 
@@ -0,0 +1,59 @@
+"""
+Tests for the agent prompt formatting helpers.
+"""
+
+import pytest
+
+from agents.state import ClassNodeState, ItemUnderNode
+from agents.utils import format_class_nodes
+
+
+class FakeItemLoader:
+    """Item loader serving contents from a dict instead of the database."""
+
+    def __init__(self, contents: dict[str, str]):
+        self.contents = contents
+
+    async def load_content_map(self, item_ids: list[str]) -> dict[str, str]:
+        return {item_id: self.contents[item_id] for item_id in item_ids}
+
+
+@pytest.mark.unit
+class TestFormatClassNodes:
+    """Test formatting class nodes with their few shot examples."""
+
+    async def test_few_shot_examples_follow_in_place_updates(self):
+        """Test that flag flips and appends on node.items show up in the next format."""
+        node = ClassNodeState(
+            id="node1",
+            parent_node_id="root",
+            label="Phones",
+            description="Mobile phones",
+            items=[ItemUnderNode(item_id="item1", confidence_score=0.9)],
+        )
+        item_loader = FakeItemLoader({"item1": "iPhone 15", "item2": "Pixel 8"})
+
+        formatted = await format_class_nodes(
+            node, 5, 100, "user", item_loader=item_loader
+        )
+        assert "Exemplary Items" not in formatted
+
+        node.items[0].used_as_few_shot_example = True
+        node.items.append(
+            ItemUnderNode(
+                item_id="item2", confidence_score=0.8, used_as_few_shot_example=True
+            )
+        )
+
+        formatted = await format_class_nodes(
+            node, 5, 100, "user", item_loader=item_loader
+        )
+        assert "- iPhone 15" in formatted
+        assert "- Pixel 8" in formatted
+
+        copied = node.model_copy(update={"items": node.items[:1]})
+        formatted = await format_class_nodes(
+            copied, 5, 100, "user", item_loader=item_loader
+        )
+        assert "- iPhone 15" in formatted
+        assert "Pixel 8" not in formatted
@@ -5,6 +5,7 @@ Tests for authentication endpoints.
 import pytest
 from httpx import AsyncClient
 from unittest.mock import AsyncMock
+from app.core.config import settings
 from app.core.security import create_refresh_token
 from tests.conftest import create_test_jwt
 
@@ -13,14 +14,13 @@ from tests.conftest import create_test_jwt
 class TestAuthEndpoints:
     """Test authentication endpoints."""
 
-    async def test_google_login(self, client: AsyncClient, mock_google_oauth):
-        """Test Google OAuth login URL generation."""
-        response = await client.get("/api/v1/auth/google/login")
+    async def test_google_login_redirect(self, client: AsyncClient, mock_google_oauth):
+        """Test redirecting to the Google OAuth login page."""
+        response = await client.get("/api/v1/auth/google/login/redirect")
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "auth_url" in data
-        assert "accounts.google.com" in data["auth_url"]
+        assert response.status_code == 307
+        assert "accounts.google.com" in response.headers["location"]
+        mock_google_oauth.authorize_redirect.assert_awaited_once()
 
     async def test_google_callback_new_user(
         self, client: AsyncClient, mock_db, mock_google_oauth
@@ -29,11 +29,11 @@ class TestAuthEndpoints:
         # Simulate callback with code
         response = await client.get("/api/v1/auth/google/callback?code=test-auth-code")
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "access_token" in data
-        assert "refresh_token" in data
-        assert data["token_type"] == "bearer"
+        assert response.status_code == 307
+        location = response.headers["location"]
+        assert location.startswith(f"{settings.FRONTEND_URL}/auth/callback?")
+        assert "access_token=" in location
+        assert "refresh_token=" in location
 
         # Verify user was created
         user = await mock_db.users.find_one({"email": "test@example.com"})
@@ -46,10 +46,10 @@ class TestAuthEndpoints:
     ):
         """Test Google OAuth callback for existing user."""
         # Update mock to return existing user's data
-        mock_google_oauth.return_value.authorize_access_token.return_value = {
+        mock_google_oauth.authorize_access_token.return_value = {
             "access_token": "google-access-token",
             "userinfo": {
-                "id": test_user.google_id,
+                "sub": test_user.google_id,
                 "email": test_user.email,
                 "name": "Updated Name",
                 "picture": "https://example.com/new-picture.jpg",
@@ -58,27 +58,24 @@ class TestAuthEndpoints:
 
         response = await client.get("/api/v1/auth/google/callback?code=test-auth-code")
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "access_token" in data
-        assert "refresh_token" in data
+        assert response.status_code == 307
+        assert "access_token=" in response.headers["location"]
 
         # Verify user was updated
         user = await mock_db.users.find_one({"_id": test_user.id})
         assert user["name"] == "Updated Name"
         assert user["picture"] == "https://example.com/new-picture.jpg"
+        assert await mock_db.users.count_documents({}) == 1
 
     async def test_google_callback_error(self, client: AsyncClient, mock_google_oauth):
         """Test Google OAuth callback error handling."""
         # Mock OAuth error
-        mock_google_oauth.return_value.authorize_access_token.side_effect = Exception(
-            "OAuth error"
-        )
+        mock_google_oauth.authorize_access_token.side_effect = Exception("OAuth error")
 
         response = await client.get("/api/v1/auth/google/callback?code=test-auth-code")
 
-        assert response.status_code == 400
-        assert "Failed to authenticate with Google" in response.json()["detail"]
+        assert response.status_code == 307
+        assert "error=authentication_failed" in response.headers["location"]
 
     async def test_refresh_token_valid(self, client: AsyncClient, test_user, mock_db):
         """Test refreshing access token with valid refresh token."""
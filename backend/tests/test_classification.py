@@ -2,13 +2,17 @@
 Tests for classification endpoints.
 """
 
+import asyncio
 import pytest
 from httpx import AsyncClient
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
 from unittest.mock import AsyncMock
 from app.models.user import UserInDB
 from app.models.taxonomy import TaxonomyInDB
 from app.models.node import NodeInDB
 from agents.state import ItemState
+from app.api.v1.endpoints import classification
 
 
 @pytest.mark.unit
@@ -87,9 +91,8 @@ class TestClassificationEndpoints:
     ):
         """Test classification when no unclassified items exist."""
         # Mark all items as classified
-        collection_name = f"items_{str(test_user.id)}"
-        await mock_db[collection_name].update_many(
-            {},
+        await mock_db.items.update_many(
+            {"user_id": str(test_user.id)},
             {
                 "$set": {
                     "classified_as": [{"node_id": "node1", "confidence_score": 0.9}]
@@ -418,3 +421,118 @@ class TestClassificationEndpoints:
         assert call_args.kwargs["models"] == ["gpt-4o-mini", "claude-3-5-haiku"]
         assert call_args.kwargs["majority_threshold"] == 0.7
         assert call_args.kwargs["total_invocations"] == 20
+
+    async def test_update_classifier_config_keeps_concurrent_changes(
+        self,
+        client: AsyncClient,
+        test_taxonomy: TaxonomyInDB,
+        auth_headers: dict,
+        mock_db,
+    ):
+        """Test that a config update only writes its own fields over newer stored state."""
+        taxonomy_id = str(test_taxonomy.id)
+        # Warm the taxonomy cache of this worker
+        response = await client.put(
+            f"/api/v1/classification/config/{taxonomy_id}",
+            json={"batch_size": 15},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        await client.get(
+            f"/api/v1/classification/config/{taxonomy_id}", headers=auth_headers
+        )
+
+        # Another worker saves classifier state behind this worker's cache
+        await mock_db.taxonomies.update_one(
+            {"_id": test_taxonomy.id},
+            {
+                "$set": {
+                    "classifier_state.majority_threshold": 0.8,
+                    "classifier_state.examined_node_ids": ["node1"],
+                }
+            },
+        )
+
+        response = await client.put(
+            f"/api/v1/classification/config/{taxonomy_id}",
+            json={"batch_size": 20},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["batch_size"] == 20
+        assert data["majority_threshold"] == 0.8
+        assert data["examined_node_ids"] == ["node1"]
+
+        taxonomy_doc = await mock_db.taxonomies.find_one({"_id": test_taxonomy.id})
+        assert taxonomy_doc["classifier_state"]["batch_size"] == 20
+        assert taxonomy_doc["classifier_state"]["majority_threshold"] == 0.8
+        assert taxonomy_doc["classifier_state"]["examined_node_ids"] == ["node1"]
+
+    async def test_remove_items_only_requires_taxonomy_ownership(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        mock_db,
+    ):
+        """Test that another user's taxonomy nodes are left untouched."""
+        other_taxonomy = TaxonomyInDB(
+            user_id=str(ObjectId()), name="Other Taxonomy", aspect="category"
+        )
+        await mock_db.taxonomies.insert_one(
+            other_taxonomy.model_dump(by_alias=True, context={"keep_objectid": True})
+        )
+        taxonomy_id = str(other_taxonomy.id)
+        node_id, item_id = ObjectId(), str(ObjectId())
+        node_items = [{"item_id": item_id, "confidence_score": 0.9}]
+        await mock_db[f"nodes_{taxonomy_id}"].insert_one(
+            {"_id": node_id, "label": "Node", "items": node_items}
+        )
+
+        response = await client.post(
+            "/api/v1/classification/remove-items-only",
+            json={
+                "taxonomy_id": taxonomy_id,
+                "item_ids": [item_id],
+                "node_id_to_remove": str(node_id),
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
+        node = await mock_db[f"nodes_{taxonomy_id}"].find_one({"_id": node_id})
+        assert node["items"] == node_items
+
+
+@pytest.mark.unit
+class TestClassificationSessions:
+    """Test running background sessions."""
+
+    async def test_run_session_survives_failed_cancel_poll(self, mock_db, monkeypatch):
+        """Test that a failing cancel poll doesn't cancel or fail the session."""
+        monkeypatch.setattr(classification, "SESSION_CANCEL_POLL_SECONDS", 0.01)
+        session_id = await classification._create_session(
+            mock_db, "user", "classification", "taxonomy"
+        )
+
+        find_one = mock_db.sessions.find_one
+        polls = 0
+
+        async def flaky_find_one(*args, **kwargs):
+            nonlocal polls
+            polls += 1
+            if polls == 1:
+                raise AutoReconnect("connection reset")
+            return await find_one(*args, **kwargs)
+
+        monkeypatch.setattr(mock_db.sessions, "find_one", flaky_find_one)
+
+        async def work():
+            await asyncio.sleep(0.1)
+
+        await classification._run_session(mock_db, session_id, work)
+
+        assert polls > 1
+        session = await find_one({"_id": session_id})
+        assert session["status"] == "completed"
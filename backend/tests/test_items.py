@@ -36,8 +36,7 @@ class TestItemsEndpoints:
         assert "Successfully uploaded 3 items" in data["message"]
 
         # Verify items in database
-        collection_name = f"items_{str(test_user.id)}"
-        count = await mock_db[collection_name].count_documents({})
+        count = await mock_db.items.count_documents({"user_id": str(test_user.id)})
         assert count == 3
 
     async def test_upload_items_empty(self, client: AsyncClient, auth_headers: dict):
@@ -88,10 +87,10 @@ class TestItemsEndpoints:
     ):
         """Test pagination when listing items."""
         # Add more items
-        collection_name = f"items_{str(test_user.id)}"
         for i in range(10):
-            await mock_db[collection_name].insert_one(
+            await mock_db.items.insert_one(
                 {
+                    "user_id": str(test_user.id),
                     "id": f"test-item-{i}",
                     "content": f"Test Item {i}",
                     "classified_as": [],
@@ -146,8 +145,9 @@ class TestItemsEndpoints:
         assert response.status_code == 204
 
         # Verify item is deleted
-        collection_name = f"items_{str(test_user.id)}"
-        item = await mock_db[collection_name].find_one({"id": item_id})
+        item = await mock_db.items.find_one(
+            {"user_id": str(test_user.id), "id": item_id}
+        )
         assert item is None
 
     async def test_delete_item_not_found(self, client: AsyncClient, auth_headers: dict):
@@ -173,8 +173,7 @@ class TestItemsEndpoints:
         assert response.status_code == 204
 
         # Verify all items are deleted
-        collection_name = f"items_{str(test_user.id)}"
-        count = await mock_db[collection_name].count_documents({})
+        count = await mock_db.items.count_documents({"user_id": str(test_user.id)})
         assert count == 0
 
     async def test_get_unclassified_batch(
@@ -238,3 +237,64 @@ class TestItemsEndpoints:
         data = response.json()
         assert data["count"] == 0  # Other user should have no items
         assert data["unclassified_count"] == 0
+
+    async def test_items_scoped_by_user_id(
+        self,
+        client: AsyncClient,
+        test_user: UserInDB,
+        test_taxonomy,
+        auth_headers: dict,
+        mock_db,
+    ):
+        """Test that items in the shared collection are only visible to their owner."""
+        own_id, other_id = ObjectId(), ObjectId()
+        await mock_db.items.insert_many(
+            [
+                {
+                    "_id": own_id,
+                    "content": "own item",
+                    "classified_as": {},
+                    "user_id": str(test_user.id),
+                },
+                {
+                    "_id": other_id,
+                    "content": "other user's item",
+                    "classified_as": {},
+                    "user_id": str(ObjectId()),
+                },
+            ]
+        )
+        taxonomy_id = str(test_taxonomy.id)
+
+        response = await client.get(
+            "/api/v1/items/list",
+            params={"taxonomy_id": taxonomy_id},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 1
+        assert [item["id"] for item in data["items"]] == [str(own_id)]
+
+        response = await client.delete(
+            f"/api/v1/items/{other_id}", headers=auth_headers
+        )
+        assert response.status_code == 404
+
+        response = await client.delete("/api/v1/items", headers=auth_headers)
+        assert response.status_code == 204
+        assert await mock_db.items.count_documents({}) == 1
+        assert await mock_db.items.find_one({"_id": other_id}) is not None
+
+    @pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 1001}, {"skip": -1}])
+    async def test_list_items_page_bounds(
+        self, client: AsyncClient, auth_headers: dict, params: dict
+    ):
+        """Test that list paging parameters are bounded."""
+        response = await client.get(
+            "/api/v1/items/list",
+            params={"taxonomy_id": str(ObjectId()), **params},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 422
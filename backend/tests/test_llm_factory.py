@@ -0,0 +1,33 @@
+"""
+Tests for the shared LLM HTTP client lifecycle.
+"""
+
+import pytest
+
+from agents import llm_factory
+
+
+@pytest.mark.unit
+class TestSharedHttpClient:
+    """Test the lifespan-managed HTTP client used by the OpenAI clients."""
+
+    async def test_open_and_close(self, monkeypatch):
+        """Cached OpenAI clients pick up the open client and drop it on close."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+        http_client = llm_factory.open_http_async_client(max_concurrency=4)
+        try:
+            chat = llm_factory._get_cached_openai_client("gpt-4o-mini")
+            assert chat.http_async_client is http_client
+        finally:
+            await llm_factory.close_http_async_client()
+
+        assert http_client.is_closed
+        assert llm_factory._http_async_client is None
+        chat = llm_factory._get_cached_openai_client("gpt-4o-mini")
+        assert chat.http_async_client is None
+
+    async def test_close_without_open(self):
+        """Closing when no client was opened is a no-op."""
+        await llm_factory.close_http_async_client()
+        assert llm_factory._http_async_client is None
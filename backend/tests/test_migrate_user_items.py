@@ -0,0 +1,68 @@
+"""
+Tests for the legacy per-user items collection migration.
+"""
+
+import pytest
+from bson import ObjectId
+
+from scripts.migrate_user_items import (
+    migrate_user_items_collection,
+    migrate_user_items_collections,
+    remapped_item_id,
+)
+
+
+@pytest.mark.unit
+class TestMigrateUserItems:
+    """Test moving items_{user_id} collections into items."""
+
+    async def test_migrate_moves_items_and_drops_collection(self, mock_db):
+        """Test that legacy items get the owner's user_id and the collection is dropped."""
+        user_id = str(ObjectId())
+        await mock_db[f"items_{user_id}"].insert_many(
+            [{"_id": ObjectId(), "content": f"item {i}"} for i in range(3)]
+        )
+
+        await migrate_user_items_collections(mock_db)
+
+        assert await mock_db.items.count_documents({"user_id": user_id}) == 3
+        assert f"items_{user_id}" not in await mock_db.list_collection_names()
+
+    async def test_migrate_remaps_colliding_ids(self, mock_db):
+        """Test that an _id already used by another user's item gets a new id."""
+        user_id = str(ObjectId())
+        shared_id = ObjectId()
+        await mock_db.items.insert_one(
+            {"_id": shared_id, "content": "sample", "user_id": str(ObjectId())}
+        )
+        await mock_db[f"items_{user_id}"].insert_one(
+            {"_id": shared_id, "content": "sample"}
+        )
+
+        await migrate_user_items_collections(mock_db)
+
+        migrated = await mock_db.items.find_one({"user_id": user_id})
+        assert migrated["_id"] == remapped_item_id(user_id, shared_id)
+        assert await mock_db.items.count_documents({}) == 2
+
+    async def test_migrate_rerun_is_idempotent(self, mock_db):
+        """Test that re-running after an interrupted migration inserts nothing twice."""
+        user_id = str(ObjectId())
+        shared_id = ObjectId()
+        await mock_db.items.insert_one(
+            {"_id": shared_id, "content": "sample", "user_id": str(ObjectId())}
+        )
+        legacy_docs = [
+            {"_id": shared_id, "content": "sample"},
+            {"_id": ObjectId(), "content": "own item"},
+        ]
+        name = f"items_{user_id}"
+
+        await mock_db[name].insert_many([dict(doc) for doc in legacy_docs])
+        assert await migrate_user_items_collection(mock_db, name) == 2
+
+        # Simulate a run that was interrupted before the legacy collection was dropped
+        await mock_db[name].insert_many([dict(doc) for doc in legacy_docs])
+        assert await migrate_user_items_collection(mock_db, name) == 0
+
+        assert await mock_db.items.count_documents({"user_id": user_id}) == 2
@@ -0,0 +1,217 @@
+"""
+Tests for the LangGraph state reducers.
+"""
+
+import pytest
+
+from agents.state import (
+    ROOT_NODE_ID,
+    ClassNodeState,
+    ItemState,
+    NodeAndConfidence,
+    ReducerOp,
+    item_reducer,
+    node_reducer,
+    root_node,
+)
+
+
+def make_node(node_id: str, label: str = "Label") -> ClassNodeState:
+    return ClassNodeState(
+        id=node_id,
+        parent_node_id=ROOT_NODE_ID,
+        label=label,
+        description=f"Description of {node_id}",
+    )
+
+
+def make_item(item_id: str, *classified_as: tuple[str, float]) -> ItemState:
+    return ItemState(
+        id=item_id,
+        content=f"Content of {item_id}",
+        classified_as=[
+            NodeAndConfidence(node_id=node_id, confidence_score=score)
+            for node_id, score in classified_as
+        ],
+    )
+
+
+def scores(item: ItemState) -> list[tuple[str, float]]:
+    return [(nc.node_id, nc.confidence_score) for nc in item.classified_as]
+
+
+@pytest.mark.unit
+class TestNodeReducer:
+    """Test merging node updates into the nodes state."""
+
+    def test_replaces_node_at_index_zero(self):
+        """Test that a node at index 0 is replaced instead of appended again."""
+        original = [make_node("a"), make_node("b")]
+
+        result = node_reducer(original, [make_node("a", label="Updated")])
+
+        assert [node.id for node in result] == ["a", "b"]
+        assert result[0].label == "Updated"
+
+    def test_replaces_existing_and_appends_new_nodes(self):
+        """Test that known ids are replaced in place and unknown ids are appended in order."""
+        original = [root_node, make_node("a"), make_node("b")]
+
+        result = node_reducer(
+            original,
+            [make_node("c"), make_node("b", label="Updated"), make_node("d")],
+        )
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "a", "b", "c", "d"]
+        assert result[2].label == "Updated"
+
+    def test_same_id_twice_in_one_update_keeps_last(self):
+        """Test that a node added earlier in the same update is replaced by a later one."""
+        result = node_reducer(
+            [root_node],
+            [make_node("a", label="First"), make_node("a", label="Second")],
+        )
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "a"]
+        assert result[1].label == "Second"
+
+    def test_empty_state_starts_with_root(self):
+        """Test that the root node is added when merging into an empty state."""
+        result = node_reducer([], make_node("a"))
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "a"]
+
+    def test_none_update_keeps_state(self):
+        """Test that a None update returns the state unchanged."""
+        original = [root_node, make_node("a")]
+
+        assert node_reducer(original, None) is original
+
+    def test_replace_all(self):
+        """Test that REPLACE_ALL keeps only the root and the given nodes."""
+        original = [root_node, make_node("a"), make_node("b")]
+
+        result = node_reducer(original, [ReducerOp.REPLACE_ALL, make_node("c")])
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "c"]
+
+    def test_reset(self):
+        """Test that RESET keeps only the root node."""
+        original = [root_node, make_node("a")]
+
+        result = node_reducer(original, [ReducerOp.RESET])
+
+        assert [node.id for node in result] == [ROOT_NODE_ID]
+
+    @pytest.mark.parametrize("sentinel_first", [True, False])
+    def test_legacy_replace_all_sentinel_at_either_end(self, sentinel_first: bool):
+        """Test that a node with id REPLACE_ALL is recognised as first or last element."""
+        sentinel = make_node("REPLACE_ALL")
+        new = [make_node("c")]
+        new = [sentinel] + new if sentinel_first else new + [sentinel]
+
+        result = node_reducer([root_node, make_node("a")], new)
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "c"]
+
+    def test_legacy_sentinel_in_the_middle_is_a_node(self):
+        """Test that a sentinel id is only recognised at index 0 or -1."""
+        new = [make_node("b"), make_node("RESET"), make_node("c")]
+
+        result = node_reducer([root_node, make_node("a")], new)
+
+        assert [node.id for node in result] == [ROOT_NODE_ID, "a", "b", "RESET", "c"]
+
+
+@pytest.mark.unit
+class TestItemReducer:
+    """Test merging item updates into the items state."""
+
+    def test_replaces_classified_as_entries_in_place(self):
+        """Test that entries for a known node are replaced in place and new ones appended."""
+        existing = make_item("item1", ("n1", 0.5), ("n2", 0.7))
+        classified_as = existing.classified_as
+
+        result = item_reducer(
+            [existing], [make_item("item1", ("n1", 0.9), ("n3", 0.4))]
+        )
+
+        assert result == [existing]
+        assert existing.classified_as is classified_as
+        assert scores(existing) == [("n1", 0.9), ("n2", 0.7), ("n3", 0.4)]
+
+    def test_same_node_twice_in_one_update_keeps_last(self):
+        """Test that a node entry added earlier in the same update is replaced by a later one."""
+        existing = make_item("item1")
+
+        item_reducer(
+            [existing],
+            [make_item("item1", ("n1", 0.2)), make_item("item1", ("n1", 0.8))],
+        )
+
+        assert scores(existing) == [("n1", 0.8)]
+
+    def test_existing_item_at_index_zero(self):
+        """Test that the item at index 0 is merged instead of appended again."""
+        original = [make_item("item1", ("n1", 0.5)), make_item("item2")]
+
+        result = item_reducer(original, make_item("item1", ("n2", 0.6)))
+
+        assert [item.id for item in result] == ["item1", "item2"]
+        assert scores(result[0]) == [("n1", 0.5), ("n2", 0.6)]
+
+    def test_update_without_classifications_keeps_existing_item(self):
+        """Test that an update with no classified_as leaves the existing entries alone."""
+        existing = make_item("item1", ("n1", 0.5))
+
+        item_reducer(
+            [existing], [ItemState(id="item1", content="x", classified_as=None)]
+        )
+
+        assert scores(existing) == [("n1", 0.5)]
+        assert existing.content == "Content of item1"
+
+    def test_existing_item_without_classifications(self):
+        """Test that classifications are merged into an item whose classified_as is None."""
+        existing = ItemState(id="item1", content="x", classified_as=None)
+
+        item_reducer([existing], [make_item("item1", ("n1", 0.5))])
+
+        assert scores(existing) == [("n1", 0.5)]
+
+    def test_appends_new_items(self):
+        """Test that unknown items are appended in order."""
+        original = [make_item("item1")]
+
+        result = item_reducer(original, [make_item("item2"), make_item("item3")])
+
+        assert [item.id for item in result] == ["item1", "item2", "item3"]
+
+    def test_replace_all(self):
+        """Test that REPLACE_ALL returns only the given items."""
+        result = item_reducer(
+            [make_item("item1")], [ReducerOp.REPLACE_ALL, make_item("item2")]
+        )
+
+        assert [item.id for item in result] == ["item2"]
+
+    def test_reset(self):
+        """Test that RESET clears the items."""
+        assert item_reducer([make_item("item1")], [ReducerOp.RESET]) == []
+
+    @pytest.mark.parametrize("sentinel_first", [True, False])
+    def test_legacy_reset_sentinel_at_either_end(self, sentinel_first: bool):
+        """Test that an item with id RESET clears the items as first or last element."""
+        sentinel = make_item("RESET")
+        new = [make_item("item2"), make_item("item3")]
+        new = [sentinel] + new if sentinel_first else new + [sentinel]
+
+        assert item_reducer([make_item("item1")], new) == []
+
+    def test_legacy_sentinel_in_the_middle_is_an_item(self):
+        """Test that a sentinel id is only recognised at index 0 or -1."""
+        new = [make_item("item2"), make_item("RESET"), make_item("item3")]
+
+        result = item_reducer([make_item("item1")], new)
+
+        assert [item.id for item in result] == ["item1", "item2", "RESET", "item3"]
@@ -20,7 +20,7 @@ class TestTaxonomyEndpoints:
         taxonomy_data = {"name": "Product Categories", "aspect": "type"}
 
         response = await client.post(
-            "/api/v1/taxonomies/", json=taxonomy_data, headers=auth_headers
+            "/api/v1/taxonomies", json=taxonomy_data, headers=auth_headers
         )
 
         assert response.status_code == 201
@@ -41,6 +41,22 @@ class TestTaxonomyEndpoints:
         assert db_taxonomy is not None
         assert db_taxonomy["name"] == "Product Categories"
 
+    async def test_create_taxonomy_creates_node_indexes(
+        self, client: AsyncClient, test_user: UserInDB, auth_headers: dict, mock_db
+    ):
+        """Test that creating a taxonomy indexes its nodes collection."""
+        response = await client.post(
+            "/api/v1/taxonomies",
+            json={"name": "Indexed Taxonomy", "aspect": "type"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        taxonomy_id = response.json()["taxonomy"]["id"]
+        indexes = await mock_db[f"nodes_{taxonomy_id}"].index_information()
+        indexed_keys = {key for index in indexes.values() for key, _ in index["key"]}
+        assert {"parent_node_id", "items.item_id"} <= indexed_keys
+
     async def test_create_taxonomy_duplicate_name(
         self, client: AsyncClient, test_taxonomy: TaxonomyInDB, auth_headers: dict
     ):
@@ -51,7 +67,7 @@ class TestTaxonomyEndpoints:
         }
 
         response = await client.post(
-            "/api/v1/taxonomies/", json=taxonomy_data, headers=auth_headers
+            "/api/v1/taxonomies", json=taxonomy_data, headers=auth_headers
         )
 
         assert response.status_code == 400
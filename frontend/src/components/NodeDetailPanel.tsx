@@ -161,15 +161,11 @@ const NodeDetailPanel: React.FC<NodeDetailPanelProps> = React.memo(({ node, item
         if (itemIds.length > 0) {
             try {
                 setIsDeleting(true);
-                await Promise.all(
-                    itemIds.map(itemId =>
-                        classificationApi.removeClassification({
-                            taxonomy_id: taxonomyId,
-                            item_id: itemId,
-                            node_id_to_remove: node.id,
-                        })
-                    )
-                );
+                await classificationApi.removeClassificationItemsOnly({
+                    taxonomy_id: taxonomyId,
+                    item_ids: itemIds,
+                    node_id_to_remove: node.id,
+                });
 
                 // Invalidate items query to refetch from database
                 queryClient.invalidateQueries({ queryKey: ['itemsOfSelectedNode'], exact: false });
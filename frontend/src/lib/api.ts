@@ -279,7 +279,8 @@ export const itemsApi = {
       `/items/list?taxonomy_id=${taxonomyId}&skip=${skip}&limit=${limit}`
     ),
 
-  exportAll: (): Promise<{ data: string }> => api.get("/items/export-all"),
+  exportAll: (): Promise<{ data: string }> =>
+    api.get("/items/export-all", { responseType: "text" }),
 
   getCount: (): Promise<{ data: number }> => api.get("/items/count"),
 
@@ -191,7 +191,7 @@ const ManageItems: React.FC = () => {
     const handleExportAllItems = async () => {
         try {
             const response = await itemsApi.exportAll();
-            const blob = new Blob([JSON.stringify(response.data, null, 2)], { type: 'application/json' });
+            const blob = new Blob([response.data], { type: 'application/x-ndjson' });
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
 